@@ -0,0 +1,173 @@
+from functools import lru_cache
+import numpy as np
+from utils import is_pint_unit, singularize, unit_conversion
+
+############################################
+# Columnar aggregation
+############################################
+
+# merging a big pile of items one pair at a time through ShoppingIngredient's +
+# means a python call, a table lookup and a fraction per row. here the items
+# are lowered to arrays (group, base unit factor, quantity), summed per group
+# in one go with numpy, and only turned back into ingredients at the end.
+#
+# the display unit is picked the same way the pairwise fold picks it: start
+# with the first row's unit, and switch to a later row's unit whenever it's
+# bigger and the running total is at least 1 of it. since the unit only ever
+# gets bigger, that's the biggest unit among the first row and the later rows
+# where the running total had reached 1 of them, the earliest one on ties.
+
+# pint units that aren't in the conversion table are worked out through pint, as
+# the pairwise path adds them, rather than kept apart
+@lru_cache(maxsize=256)
+def _pint_conversion(unit):
+  base = (1 * unit).to_base_units()
+  return str(base.dimensionality), float(base.magnitude)
+
+def _group(item):
+  '''
+  Return the (dimension, factor) an item is grouped and summed by, or None if the pairwise path wouldn't merge it.
+  '''
+  if item._quantity is None or item.amount_two:
+    return None
+  unit = item.unit
+  if is_pint_unit(unit):
+    conversion = unit_conversion(unit)
+    if conversion:
+      return conversion.dimension, conversion.factor
+    return _pint_conversion(unit)
+  # string units only add to the same unit, singular or plural, and no unit only
+  # to no unit
+  return ('unit', singularize(str(unit)) if unit else ''), 1.0
+
+def lower_ingredients(items):
+  '''
+  Lower a list of ingredients to columns.
+
+  Parameters
+  ----------
+  items : list of ShoppingIngredient
+    The ingredients to lower.
+
+  Returns
+  -------
+  tuple
+    (rows, groups, factors, quantities), where rows are the positions in items that can be merged, groups are their group ids (numbered by first appearance) and factors and quantities are float arrays. Items that can't be merged aren't in rows.
+  '''
+  rows, groups, factors, quantities = [], [], [], []
+  ids = {}
+  for row, item in enumerate(items):
+    group = _group(item)
+    if group is None:
+      continue
+    dimension, factor = group
+    rows.append(row)
+    groups.append(ids.setdefault((item.key, dimension), len(ids)))
+    factors.append(factor)
+    quantities.append(float(item._quantity))
+  return (
+    np.array(rows, dtype=np.intp),
+    np.array(groups, dtype=np.intp),
+    np.array(factors, dtype=np.float64),
+    np.array(quantities, dtype=np.float64),
+  )
+
+def aggregate_columns(groups, factors, quantities):
+  '''
+  Sum lowered rows per group and pick each group's display unit.
+
+  Parameters
+  ----------
+  groups : numpy.ndarray
+    Each row's group id, numbered from 0 by first appearance.
+  factors : numpy.ndarray
+    Each row's base unit factor.
+  quantities : numpy.ndarray
+    Each row's quantity, in its own unit.
+
+  Returns
+  -------
+  tuple
+    (display, totals), where display is the row whose unit each group is shown in and totals is each group's sum in that unit.
+  '''
+  # nothing to merge, ie no item had a quantity
+  if len(groups) == 0:
+    return np.empty(0, np.intp), np.empty(0)
+  count = int(groups.max()) + 1
+  base = quantities * factors
+  # rows sorted by group, keeping their order within the group
+  order = np.argsort(groups, kind='stable')
+  sizes = np.bincount(groups, minlength=count)
+  starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+  sorted_groups = groups[order]
+  sorted_factors = factors[order]
+  running = np.cumsum(base[order])
+  running -= np.repeat(running[starts] - base[order][starts], sizes)
+  first = np.zeros(len(order), dtype=bool)
+  first[starts] = True
+  candidate = first | (running / sorted_factors >= 1)
+  score = np.where(candidate, sorted_factors, -np.inf)
+  best = np.maximum.reduceat(score, starts)
+  position = np.where(score == best[sorted_groups], np.arange(len(order)), len(order))
+  display = order[np.minimum.reduceat(position, starts)]
+  totals = np.bincount(groups, weights=base, minlength=count)
+  return display, totals / factors[display]
+
+def aggregate_ingredients(items):
+  '''
+  Merge ingredients the way adding them to a list one at a time would, in a single vectorized pass.
+
+  Items are merged by key and dimension. An item that the pairwise path wouldn't merge, because it has no single quantity or has a secondary amount, is passed through as it is. Where the pairwise path would raise because two items with the same key have incompatible units, the items are kept as separate rows instead.
+
+  Parameters
+  ----------
+  items : list of ShoppingIngredient
+    The ingredients to merge. They aren't changed.
+
+  Returns
+  -------
+  list of ShoppingIngredient
+    One ingredient per group, in order of first appearance, with unmerged items in their place. Groups of more than one item are new ingredients.
+  '''
+  return [item for item, _ in aggregate_ingredient_groups(items)]
+
+def aggregate_ingredient_groups(items):
+  '''
+  Merge ingredients like aggregate_ingredients, keeping track of which items went into each one.
+
+  Returns
+  -------
+  list of tuple
+    (ingredient, members) for each ingredient aggregate_ingredients would return, in the same order, where members is the positions in items of the items merged into it.
+  '''
+  rows, groups, factors, quantities = lower_ingredients(items)
+  display, totals = aggregate_columns(groups, factors, quantities)
+  sizes = np.bincount(groups, minlength=len(totals))
+  # groups are numbered by first appearance, so their first rows are in order
+  firsts = np.unique(groups, return_index=True)[1]
+  merged = {}
+  for group, (first_row, row, total) in enumerate(zip(firsts.tolist(), display.tolist(), totals.tolist())):
+    first = items[rows[first_row]]
+    if sizes[group] == 1:
+      merged[group] = first
+      continue
+    new = first._copy()
+    shown = items[rows[row]]
+    if shown is not first:
+      new.unit = shown.unit
+    new._set_converted_quantity(total)
+    merged[group] = new
+
+  result = []
+  grouped = dict(zip(rows.tolist(), groups.tolist()))
+  members = {}
+  for row, item in enumerate(items):
+    group = grouped.get(row)
+    if group is None:
+      result.append((item, [row]))
+    elif group in members:
+      members[group].append(row)
+    else:
+      members[group] = [row]
+      result.append((merged[group], members[group]))
+  return result
@@ -0,0 +1,170 @@
+'''
+Rough benchmarks for the shopping list internals. Run with
+
+  python benchmark.py
+
+Numbers are only meant for comparing before/after on the same machine.
+'''
+import copy
+import subprocess
+import sys
+import time
+import tracemalloc
+import project
+from project import ShoppingIngredient
+from ingredient_categorizer import CATEGORY_INDEX
+from ingredient_parsing import fast_parse, parse_ingredient_cached
+from utils import convert_to_pint_unit, singularize, to_fraction
+from ingredient_categorizer import categorize_ingredient_broadly
+
+BENCH_UNITS = ['cup', 'tablespoon', 'teaspoon', 'gram', 'ounce', 'pound']
+
+def bench_lines(n):
+  '''
+  Return n distinct ingredient lines, all simple enough for the parser's fast path so the model doesn't dominate.
+  '''
+  terms = [term for term in CATEGORY_INDEX if term.isalpha() and fast_parse(f'1 cup {term}')][:200]
+  return [f'{i // len(terms) + 1} {BENCH_UNITS[i % len(BENCH_UNITS)]} {terms[i % len(terms)]}' for i in range(n)]
+
+class PreviousIngredient:
+  '''
+  What a ShoppingIngredient held before it became a __slots__ record - an instance dict with the parser's whole output in it, and the same handful of fields around it. Only here to measure against.
+  '''
+  def __init__(self, text):
+    self._sentence = text
+    # each one had its own copy of the parse, since it changed the unit in it
+    self._parsed = copy.deepcopy(parse_ingredient_cached(text))
+    self._quantity = None
+    self._stale = False
+    if self._parsed.amount and self._parsed.amount[0].quantity:
+      try:
+        self._quantity = to_fraction(self._parsed.amount[0].quantity)
+      except ValueError:
+        pass
+    self._category = categorize_ingredient_broadly(self._parsed.name.text)
+    self._key = singularize(self._parsed.name.text)
+    self._modified = False
+    self._rendered = None
+    if self._parsed.amount:
+      self._unit = convert_to_pint_unit(self._parsed.amount[0].unit)
+
+def _bytes_per_item(lines, make = ShoppingIngredient):
+  # warm the caches first so only the items themselves are counted
+  [make(line) for line in lines]
+  tracemalloc.start()
+  before = tracemalloc.take_snapshot()
+  items = [make(line) for line in lines]
+  after = tracemalloc.take_snapshot()
+  tracemalloc.stop()
+  size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+  del items
+  return size / len(lines)
+
+def bench_memory(n = 10000):
+  '''
+  Measure the memory held per ingredient by the previous dict-based record (PreviousIngredient) and by ShoppingIngredient, with the raw parser output kept (as in DEBUG_MODE) and without it.
+
+  Returns
+  -------
+  dict
+    Bytes per item, 'before' for the previous record, 'debug' for ShoppingIngredient in DEBUG_MODE and 'after' for it as it normally is.
+  '''
+  lines = bench_lines(n)
+  before = _bytes_per_item(lines, PreviousIngredient)
+  debug = project.DEBUG_MODE
+  try:
+    project.DEBUG_MODE = True
+    in_debug = _bytes_per_item(lines)
+    project.DEBUG_MODE = False
+    after = _bytes_per_item(lines)
+  finally:
+    project.DEBUG_MODE = debug
+  return {'items': n, 'before': before, 'debug': in_debug, 'after': after}
+
+def bench_aggregation(n = 20000, names = 200):
+  '''
+  Time merging n ingredients with the same few names one pair at a time with +, against merging them in one pass with aggregation.aggregate_ingredients.
+
+  Returns
+  -------
+  dict
+    Seconds taken by each, 'pairwise' and 'vectorized'.
+  '''
+  from aggregation import aggregate_ingredients
+  lines = bench_lines(names)
+  items = [ShoppingIngredient(lines[i % names]) for i in range(n)]
+
+  start = time.perf_counter()
+  merged = {}
+  for item in items:
+    merged[item.key] = merged[item.key] + item if item.key in merged else item
+  pairwise = time.perf_counter() - start
+
+  start = time.perf_counter()
+  aggregate_ingredients(items)
+  vectorized = time.perf_counter() - start
+  return {'items': n, 'pairwise': pairwise, 'vectorized': vectorized}
+
+def bench_startup(module = 'project'):
+  '''
+  Import module in a fresh interpreter with -X importtime, and report what each module it imports directly costs.
+
+  Returns
+  -------
+  dict
+    'total' is the whole import in seconds, and 'modules' maps each directly imported module to its cumulative import time in seconds, most expensive first.
+  '''
+  result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], capture_output=True, text=True, check=True)
+  modules = {}
+  total = 0.0
+  # modules are listed after everything they import, indented a level deeper
+  pending = {}
+  for line in result.stderr.splitlines():
+    if not line.startswith('import time:') or 'cumulative' in line:
+      continue
+    _, cumulative, name = line[len('import time:'):].split('|')
+    seconds = int(cumulative) / 1e6
+    depth = (len(name) - len(name.lstrip()) - 1) // 2
+    children = pending.pop(depth + 1, {})
+    if depth == 0 and name.strip() == module:
+      total, modules = seconds, children
+    else:
+      pending.setdefault(depth, {})[name.strip()] = seconds
+  return {'total': total, 'modules': dict(sorted(modules.items(), key=lambda item: -item[1]))}
+
+def bench_category_index(repeat = 20):
+  '''
+  Time building the category index from the vocabulary lists, against memory mapping the compiled index.
+
+  Returns
+  -------
+  dict
+    Seconds per load for each, 'build' and 'mmap'.
+  '''
+  import importlib
+  import categorizer_vocabulary
+  from ingredient_categorizer import DEFAULT_CATEGORY_INDEX_PATH, CategoryIndex, build_category_index, load_category_index
+  load_category_index()
+
+  start = time.perf_counter()
+  for _ in range(repeat):
+    build_category_index(importlib.reload(categorizer_vocabulary).grocer_categories)
+  build = (time.perf_counter() - start) / repeat
+
+  start = time.perf_counter()
+  for _ in range(repeat):
+    CategoryIndex.open(DEFAULT_CATEGORY_INDEX_PATH)
+  mapped = (time.perf_counter() - start) / repeat
+  return {'build': build, 'mmap': mapped}
+
+if __name__ == '__main__':
+  result = bench_startup()
+  print(f"startup: import project took {result['total'] * 1000:.0f}ms")
+  for name, seconds in list(result['modules'].items())[:10]:
+    print(f"  {name}: {seconds * 1000:.1f}ms")
+  result = bench_category_index()
+  print(f"category index: {result['build'] * 1000:.2f}ms to build from the vocabulary, {result['mmap'] * 1000:.3f}ms to map the compiled index")
+  result = bench_memory()
+  print(f"memory: {result['items']} items, {result['before']:.0f} bytes/item for the previous dict-based record, {result['after']:.0f} bytes/item now ({result['debug']:.0f} in DEBUG_MODE)")
+  result = bench_aggregation()
+  print(f"aggregation: {result['items']} items, {result['pairwise'] * 1000:.1f}ms pairwise, {result['vectorized'] * 1000:.1f}ms vectorized")
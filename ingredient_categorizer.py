@@ -1,170 +1,291 @@
-from utils import singularize
+from utils import LRUCache, TrigramIndex, edit_distance, pluralize, singularize
+from collections.abc import Mapping
+import hashlib
+import mmap
+import os
+import struct
+import threading
 
 ############################################
 # Ingredient Categorizer
 ############################################
 
-# for now just doing a lookup of these static lists to categorize ingredients
-# obviously db later, that can be added to on the fly
-
-### Produce categories
-## Fruits
-apples = ['apple', 'fuji apple', 'gala apple', 'golden delicious apple', 'granny smith apple', 'honeycrisp apple', 'jonagold apple', 'mcintosh apple', 'red delicious apple']
-
-oranges = ['orange', 'blood orange', 'clementine', 'mandarin orange', 'navel orange', 'tangerine']
-lemons = ['lemon', 'meyer lemon']
-limes = ['lime', 'key lime']
-citrus_juices = ['fresh orange juice', 'fresh lemon juice', 'fresh lime juice', 'orange juice', 'lemon juice', 'lime juice', 'juice of orange', 'juice of lemon', 'juice of lime', 'orange zest', 'lemon zest', 'lime zest']
-citrus = [*oranges, *lemons, *limes, *citrus_juices]
-
-grapes = ['grape', 'concord grape', 'cotton candy grape', 'green grape', 'red grape', 'black grape', 'purple grape', 'seedless grape', 'grapefruit', 'red grapefruit', 'white grapefruit']
-berries = ['berry', 'blackberry', 'blueberry', 'cranberry', 'raspberry', 'strawberry']
-bananas = ['banana', 'plantain']
-kiwi = ['kiwi', 'kiwifruit']
-tropical = ['mango', 'papaya', 'pineapple', 'coconut']
-melons = ['cantaloupe', 'honeydew', 'watermelon']
-stone_fruit = ['apricot', 'cherry', 'nectarine', 'peach', 'plum']
-fruit = [*apples, *citrus, *grapes, *berries, *bananas, *kiwi, *tropical, *melons, *stone_fruit]
-
-## Vegetables
-squashes = ['acorn squash', 'butternut squash', 'delicata squash', 'hubbard squash', 'spaghetti squash', 'yellow squash', 'zucchini']
-root_vegetables = ['beet', 'carrot', 'parsnip', 'potato', 'radish', 'rutabaga', 'sweet potato', 'turnip', 'red potato', 'gold potato', 'yukon potato', 'fingerling potato', 'purple potato', 'white potato', 'russet potato', 'new potato', 'baby potato', 'baby red potato', 'baby gold potato', 'baby yukon potato', 'baby fingerling potato', 'baby purple potato', 'baby white potato',]
-leafy_greens = ['arugula', 'collard greens', 'kale', 'lettuce', 'spinach', 'swiss chard', 'endive', 'escarole', 'frisee', 'mesclun', 'mizuna', 'mustard greens', 'radicchio', 'sorrel', 'watercress', 'bok choy', 'chinese cabbage', 'napa cabbage', 'savoy cabbage', 'cabbage', ]
-cruciferous_vegetables = ['broccoli', 'brussels sprout', 'brussel', 'brussel sprout', 'cabbage', 'cauliflower', 'kohlrabi']
-alliums = ['chive', 'garlic', 'leek', 'onion', 'shallot', 'green onion', 'scallion', 'spring onion', 'ramp', 'red onion', 'white onion', 'yellow onion', 'sweet onion', 'pearl onion', 'cippolini onion', 'vidalia onion', 'walla walla onion', 'maui onion', 'elephant garlic', 'garlic scape', 'garlic chive']
-other_vegetables = ['celery', 'cucumber', 'eggplant', 'fennel', 'okra', 'pea', 'snap pea', 'snow pea', 'tomato', 'cherry tomato', 'grape tomato', 'heirloom tomato', 'roma tomato', 'beefsteak tomato', 'plum tomato', 'green tomato', 'yellow tomato', 'orange tomato', 'purple tomato', 'white tomato', 'black tomato', 'pink tomato', 'striped tomato', 'corn', 'artichoke', 'asparagus', 'snap bean', 'green bean', 'wax bean', ]
-herbs = ['basil', 'cilantro', 'dill', 'mint', 'oregano', 'parsley', 'rosemary', 'sage', 'thyme', 'fresh parsley', 'fresh flat-leaf parsley', 'fresh curly parsley', 'curly parsley']
-peppers = ['bell pepper', 'green bell pepper', 'red bell pepper', 'yellow bell pepper', 'orange bell pepper', 'green pepper', 'red pepper', 'orange pepper', 'jalapeno', 'jalapeño', 'jalapeno peppers', 'poblano', 'poblano peppers', 'serrano', 'serrano peppers']
-mushrooms = ['button mushroom', 'cremini mushroom', 'portobello mushroom', 'shiitake mushroom']
-vegetables = [*squashes, *root_vegetables, *leafy_greens, *cruciferous_vegetables, *alliums, *herbs, *peppers, *mushrooms, *other_vegetables]
-
-### Meat categories
-## Poultry
-chicken = ['chicken', 'chicken breast', 'breast', 'chicken drumstick', 'drumstick', 'chicken leg', 'chicken thigh', 'thigh', 'chicken wing', 'wing', 'ground chicken', 'whole chicken', 'chicken liver', 'chicken heart', 'chicken gizzard', 'chicken foot', 'chicken feet', 'chicken neck', 'chicken back', 'chicken cutlet', 'cutlet', 'boneless skinless chicken thigh', 'boneless skinless chicken breast', 'bone-in chicken leg', 'bone-in chicken drumstick', 'boneless skinless chicken', 'boneless skinless chicken cutlet', 'boneless skinless cutlet']
-processed_chicken = ['chicken sausage', 'chicken nugget', 'chicken tender', 'chicken strip', 'chicken patty']
-turkey = ['turkey', 'turkey breast', 'turkey leg', 'turkey wing', 'turkey liver', 'turkey heart', 'turkey gizzard', 'ground turkey', 'whole turkey', 'turkey cutlet']
-processed_turkey = ['turkey sausage', 'turkey bacon', 'turkey burger', 'turkey patty', 'turkey tender', 'turkey strip']
-duck = ['duck', 'duck breast', 'duck leg', 'duck wing', 'duck liver', 'duck heart', 'duck gizzard']
-goose = ['goose', 'goose breast', 'goose leg', 'goose wing', 'goose liver', 'goose heart', 'goose gizzard']
-quail = ['quail', 'quail breast', 'quail leg', 'quail wing', 'quail liver', 'quail heart', 'quail gizzard']
-poultry = [*chicken, *processed_chicken, *turkey, *processed_turkey, *duck, *goose, *quail]
-
-
-## Red meat
-beef = ['beef', 'beef chuck', 'beef rib', 'beef round', 'beef sirloin', 'beef tenderloin', 'ground beef', 'steak', 'ribeye', 'filet mignon', 'flank steak', 'hanger steak', 'porterhouse', 'skirt steak', 'strip steak', 't-bone steak', 'top sirloin', 'tri-tip']
-processed_beef = ['corned beef', 'pastrami']
-pork = ['pork', 'pork belly', 'pork chop', 'pork loin', 'pork rib', 'pork shoulder', 'pork sparerib', 'pork tenderloin', 'ground pork']
-processed_pork = ['bacon', 'ham', 'pork sausage', 'italian sausage', 'spicy italian sausage', 'sweet italian sausage', 'chorizo', 'kielbasa', 'pepperoni', 'salami', 'summer sausage']
-lamb = ['lamb', 'lamb chop', 'lamb leg', 'lamb loin', 'lamb rib', 'lamb shoulder', 'lamb shank', 'ground lamb']
-processed_lamb = ['lamb sausage']
-veal = ['veal', 'veal chop', 'veal leg', 'veal loin', 'veal rib', 'veal shoulder', 'ground veal']
-processed_veal = ['veal sausage']
-red_meat = [*beef, *processed_beef, *pork, *processed_pork, *lamb, *processed_lamb, *veal, *processed_veal]
-
-## Game
-venison = ['venison', 'ground venison']
-game = ['bison', 'ground bison', 'elk', 'moose', 'boar', 'bear', 'caribou', 'reindeer', 'buffalo', 'ostrich', 'emu', 'kangaroo', 'alligator', 'crocodile', 'snake', 'iguana', 'turtle', 'frog']
-game_bird = ['partridge', 'pheasant', 'quail', 'squab', 'wild turkey', 'wild duck', 'wild goose', 'wild quail', 'wild pheasant', 'wild partridge', 'wild squab', 'wild game bird']
-game_meat = [*venison, *game, *game_bird]
-
-## Seafood - these fish groups need checking haha
-shellfish = ['crab', 'crab meat', 'crabmeat', 'lobster', 'lobster meat', 'lobster tail', 'lobstermeat', 'mussel', 'oyster', 'shrimp', 'escargot', 'clam', 'scallop', 'abalone', 'conch', 'whelk', 'cockle', 'periwinkle', 'geoduck', 'sea urchin', 'uni']
-other_seafood = ['squid', 'calamari', 'octopus', 'sea cucumber']
-white_fish = ['cod', 'haddock', 'halibut', 'pollock', 'tilapia']
-oily_fish = ['mackerel', 'salmon', 'sardine', 'trout']
-flat_fish = ['flounder', 'sole']
-round_fish = ['bass', 'carp', 'perch', 'pike']
-tropical_fish = ['barracuda', 'grouper', 'snapper', 'red snapper']
-cartilaginous_fish = ['shark', 'ray']
-fillet_fish = [*white_fish, *oily_fish, *flat_fish, *round_fish, *tropical_fish]
-fish_fillets = [fish + ' fillet' for fish in fillet_fish]
-fresh_seafood = [*shellfish, *fillet_fish, *fish_fillets, *cartilaginous_fish]
-anchovy = ['anchovy', 'canned anchovy', 'anchovy fillet', 'canned anchovy fillet', 'anchovy paste', 'canned anchovy paste']
-# might put 'tuna' in here
-canned_fish = ['canned tuna', 'canned salmon', 'canned sardine', 'canned mackerel', 'canned herring', 'canned trout', 'canned fish', 'canned seafood', 'canned shellfish']
-
-## Bread
-bread = ['bread', 'baguette', 'biscuit', 'bun', 'cornbread', 'croissant', 'doughnut', 'flatbread', 'focaccia', 'hamburger bun', 'naan', 'pita', 'roll', 'sourdough', 'tortilla', 'white bread', 'whole wheat bread', 'rye bread', 'rye', 'french bread', 'italian bread', 'ciabatta', 'bagel', 'muffin', 'white bread', 'white sandwich bread']
-pastas = ['pasta', 'angel hair', 'bowtie', 'bucatini', 'fettuccine', 'linguine', 'macaroni', 'orecchiette', 'penne', 'rigatoni', 'spaghetti', 'tortellini']
-rices = ['rice', 'arborio', 'arborio rice', 'basmati', 'basmati rice', 'black rice', 'brown rice', 'cargo rice', 'jasmine rice', 'long grain rice', 'short grain rice', 'wild rice', 'white rice', 'short-grain rice', 'shortgrain rice', 'long-grain rice', 'longgrain rice', 'brown basmati rice', 'white basmati rice', 'brown jasmine rice', 'white jasmine rice', 'brown cargo rice', 'white cargo rice', 'brown long grain rice', 'white long grain rice', 'brown short grain rice', 'white short grain rice', 'brown wild rice', 'white wild rice', 'brown rice', 'white rice', 'brown basmati', 'white basmati', 'brown jasmine', 'white jasmine',]
-grains = ['barley', 'buckwheat', 'corn', 'millet', 'oats', 'quinoa', 'rye', 'sorghum', 'wheat']
-
-dairy_milks = ['milk', 'whole milk', 'skim milk', '2% milk', '1% milk', 'half and half', 'cream', 'heavy cream', 'whipping cream', 'light cream', 'half and half', 'buttermilk',]
-alternative_milks = ['almond milk', 'cashew milk', 'hemp milk', 'oat milk', 'oat creamer', 'rice milk', 'soy milk']
-butter = ['butter', 'unsalted butter', 'salted butter', 'clarified butter', 'ghee', 'margarine', 'shortening',]
-yogurt = ['yogurt', 'greek yogurt', 'plain yogurt', 'vanilla yogurt', 'fruit yogurt', 'flavored yogurt', 'full-fat yogurt', 'low-fat yogurt', 'non-fat yogurt', 'skyr', 'kefir', 'labne']
-sour_creams = ['sour cream', 'creme fraiche', 'mexican crema', 'sour cream substitute', 'sour cream alternative', ]
-
-cheeses = ['mozzarella', 'burrata', 'bocconcini', 'scamorza', 'american', 'cheddar', 'colby', 'colby-jack', 'jack', 'monterey jack', 'pepper jack', 'swiss', 'gouda', 'havarti', 'muenster', 'provolone', 'grated parmesan', 'parmesan', 'asiago', 'grated pecorino', 'pecorino', 'romano', 'gruyere', 'emmental', 'fontina', 'brie', 'camembert', 'gorgonzola', 'roquefort', 'stilton', 'boursin', 'feta', 'ricotta', 'cotija']
-other_cheeses = ['cheese', 'blue cheese', 'goat cheese', 'fior di latte', 'queso oaxaca', 'queso asadero', 'queso quesadilla', 'queso panela', 'queso chihuahua', 'queso menonita', 'queso cotija', 'queso fresco', 'queso blanco', 'cottage cheese', 'farmer cheese', 'paneer', 'cream cheese', 'neufchatel', 'mascarpone', 'queso fresco', 'queso blanco']
-# cheeses that can be with or without 'cheese' at the end, then all others
-all_cheeses =  cheeses + [c + ' cheese' for c in cheeses] + other_cheeses
-
-eggs = ['egg', 'chicken egg', 'duck egg', 'goose egg', 'quail egg', 'ostrich egg', 'emu egg', 'egg white', 'egg yolk', 'egg substitute', 'egg replacer']
-
-# going to need to use the unit 'can' to determine if it's canned vs dry
-# also plurality will be odd I think
-beans = ['black bean', 'black beans', 'black-eyed pea', 'cannellini', 'cannelini bean', 'chickpea', 'garbanzo bean', 'great northern', 'kidney', 'lentil', 'lima', 'navy', 'pinto', 'red bean', 'soybean', 'split pea', 'white bean', 'bean', 'canned bean', 'canned black bean', 'canned black-eyed pea', 'canned cannellini', 'canned chickpea', 'canned garbanzo bean', 'canned great northern', 'canned kidney', 'canned lentil', 'canned lima', 'canned navy', 'canned pinto', 'canned red bean', 'canned soybean', 'canned split pea', 'canned white bean',]
-
-# meeleon tomato varieties
-canned = ['tomato paste', 'canned tomato', 'chopped tomato', 'tomato sauce', 'canned tomato sauce', 'canned artichokes', 'canned artichoke heart', 'artichoke heart in brine', 'caper', 'caper berry']
-
-### oils and vinegars
-oils = ['oil', 'olive oil', 'vegetable oil', 'canola oil', 'coconut oil', 'sesame oil', 'peanut oil', 'sunflower oil', 'safflower oil', 'corn oil', 'soybean oil', 'grapeseed oil', 'avocado oil', 'walnut oil', 'almond oil', 'hazelnut oil', 'palm oil', 'lard', 'shortening', 'margarine', 'butter', 'ghee', 'clarified butter',]
-vinegars = ['vinegar', 'balsamic vinegar', 'apple cider vinegar', 'red wine vinegar', 'white wine vinegar', 'rice vinegar', 'sherry vinegar', 'malt vinegar', 'distilled vinegar', 'cane vinegar', 'coconut vinegar', 'date vinegar', 'honey vinegar', 'malt vinegar', 'mango vinegar', 'palm vinegar', 'sugarcane vinegar', 'beer vinegar', 'cider vinegar', 'fruit vinegar', 'herb vinegar', 'spice vinegar', 'wine vinegar',]
-
-### sauces etc
-sauces = ['sauce', 'alfredo sauce', 'bbq sauce', 'bechamel sauce', 'chimichurri sauce', 'cocktail sauce', 'cranberry sauce', 'enchilada sauce', 'gravy', 'hollandaise sauce', 'hot sauce', 'marinara sauce', 'pesto', 'salsa', 'soy sauce', 'sweet and sour sauce', 'tahini', 'teriyaki sauce', 'tzatziki', 'worcestershire sauce', 'hoisin sauce', 'oyster sauce', 'fish sauce', 'ponzu', 'tartar sauce', 'remoulade', 'ranch dressing', 'blue cheese dressing', 'thousand island dressing', 'italian dressing', 'vinaigrette', 'ranch', 'blue cheese', 'thousand island', 'italian', 'vinaigrette', 'dressing', 'dip', 'aioli', 'mayo', 'mayonnaise', 'ketchup', 'mustard', 'mustard sauce', 'dijon mustard',]
-
-### nuts
-nuts = ['nut', 'almond', 'brazil nut', 'cashew', 'chestnut', 'hazelnut', 'macadamia nut', 'pecan', 'pine nut', 'pistachio', 'walnut', 'peanut',]
-nut_butters = ['nut butter', 'almond butter', 'cashew butter', 'hazelnut butter', 'macadamia nut butter', 'pecan butter', 'peanut butter', 'walnut butter', 'pistachio butter', 'sunflower seed butter', 'tahini', 'almond paste', 'marzipan',]
-
-### seeds
-seeds = ['sunflower seed', 'pumpkin seed', 'sesame seed', 'chia seed', 'pepita', 'flaxseed', 'hemp seed', 'poppy seed',  'chia', 'flax', 'seed',]
-
-### dried fruits
-dried_berries = ['dried berry', 'dried blackberry', 'dried blueberry', 'dried cranberry', 'dried raspberry', 'dried strawberry', 'raisin', 'gold raisin', 'golden raisin', 'dried cherry', 'dried currant', 'dried grape']
-dried_fruits = ['dried apricot', 'prune', 'dried plum', 'date', 'mejool date', 'mehjool date', 'medjool date', 'fig', 'dried fig', 'dried peach', 'dried pear', 'dried apple', 'dried banana', 'dried coconut', 'dried mango', 'dried papaya', 'dried pineapple', 'dried kiwi', 'dried stone fruit', 'dried tropical fruit', 'dried fruit',]
-
-### baking
-flours = ['flour', 'all-purpose flour', 'bread flour', 'cake flour', 'pastry flour', 'self-rising flour', 'whole wheat flour', 'almond flour', 'coconut flour', 'cornmeal', 'cornstarch', 'oat flour', 'rice flour', 'rye flour', 'semolina', 'spelt flour', 'tapioca flour', 'teff flour', 'wheat flour', 'gluten-free flour', 'gluten free flour', 'gluten free all-purpose flour', 'gluten free bread flour', 'gluten free cake flour', 'gluten free pastry flour', 'gluten free self-rising flour', 'gluten free whole wheat flour', 'gluten free almond flour', 'gluten free coconut flour', 'gluten free cornmeal', 'gluten free cornstarch', 'gluten free oat flour', 'gluten free rice flour', 'gluten free rye flour', 'gluten free semolina', 'gluten free spelt flour', 'gluten free tapioca flour', 'gluten free teff flour', 'gluten free wheat flour',]
-sugars = ['sugar', 'brown sugar', 'confectioners sugar', 'powdered sugar', 'granulated sugar', 'caster sugar', 'superfine sugar', 'turbinado sugar', 'demerara sugar', 'muscovado sugar', 'palm sugar', 'coconut sugar', 'date sugar', 'maple sugar', 'molasses', 'honey', 'agave', 'corn syrup', 'golden syrup', 'maple syrup', 'pancake syrup', 'simple syrup', 'syrup', 'treacle', 'treacle syrup', 'treacle sugar', 'treacle molasses', 'treacle honey', 'treacle agave', 'treacle corn syrup', 'treacle golden syrup', 'treacle maple syrup', 'treacle pancake syrup', 'treacle simple syrup', 'treacle syrup', 'treacle treacle', 'treacle',]
-leaveners = ['baking powder', 'baking soda', 'cream of tartar', 'yeast', 'instant yeast', 'active dry yeast', 'sourdough starter', 'starter', 'levain', ]
-chocolates = ['chocolate', 'bittersweet chocolate', 'semisweet chocolate', 'dark chocolate', 'milk chocolate', 'white chocolate', 'cocoa powder', 'cacao powder', 'cacao nib', 'cacao butter', 'cacao', 'cocoa', 'chocolate chip', 'chocolate chunk', 'chocolate bar', 'chocolate syrup', 'chocolate sauce', 'chocolate spread', 'chocolate frosting', 'chocolate glaze', 'chocolate ganache', 'chocolate mousse', 'chocolate pudding',]
-baking = [*flours, *sugars, *leaveners, *chocolates]
-
-### Spices and dried herbs
-spices = ['spice', 'allspice', 'anise', 'annatto', 'asafoetida', 'caraway', 'cardamom', 'cayenne', 'celery seed', 'chervil',  'cinnamon', 'ground cinnamon', 'clove', 'ground clove', 'coriander', 'cumin', 'cumin seed', 'ground cumin', 'curry', 'curry powder', 'fennel seed', 'fenugreek seed', 'garlic powder', 'ginger powder', 'ground ginger', 'lavender', 'mustard seed', 'mustard powder', 'nutmeg', 'ground nutmeg', 'paprika', 'black pepper', 'poppy seed', 'rosemary', 'saffron', 'sage', 'savory', 'tarragon', 'thyme', 'turmeric', 'ground turmeric', 'turmeric powder', 'vanilla', 'wasabi', 'zaatar', 'ground fennel', 'ground fennel seed', 'fennel powder']
-d_herbs = ['herb', 'basil', 'bay leaf', 'chervil', 'chive', 'cilantro', 'dill', 'lavender', 'lemon grass', 'marjoram', 'mint', 'oregano', 'parsley', 'rosemary', 'sage', 'savory', 'tarragon', 'thyme']
-dried_herbs = [h + ', dried' for h in d_herbs] + ['dried ' + h for h in d_herbs]
-dried_peppers = [p + ', dried' for p in peppers] + ['dried ' + p for p in peppers] + ['white pepper', 'cayenne pepper', 'chipotle powder', 'ground chili', 'chili powder', 'new mexico chili powder', 'red-pepper', 'red-pepper flakes', 'red pepper flakes']
-all_spices = [*spices, *dried_herbs, *dried_peppers]
-
-misc_pantry = ['bread crumbs', 'breadcrumbs', 'panko', 'panko breadcrumbs', 'chicken broth', 'beef broth', 'chicken stock', 'beef stock']
-
-### Frozen foods
-frozen_veggies = ['frozen peas', 'frozen carrots', 'frozen spinach', 'frozen corn', 'frozen lima beans', 'frozen green beans', 'frozen broccoli', 'frozen cauliflower', 'frozen brussels sprouts', 'frozen mixed vegetables', 'frozen stir fry vegetables', 'frozen vegetable medley', 'frozen vegetable blend', 'frozen vegetable mix', 'frozen vegetable', 'frozen veggie', 'frozen veg', 'frozen greens', 'frozen leafy greens', 'frozen root vegetables', 'frozen squash', 'frozen bell pepper', 'frozen vegetable' ]
-frozen_fruit = ['frozen fruit', 'frozen berry', 'frozen banana', 'frozen mango', 'frozen pineapple', 'frozen peach', 'frozen apple', 'frozen pear', 'frozen cherry', 'frozen blueberry', 'frozen blackberry', 'frozen raspberry', 'frozen strawberry', 'frozen cranberry', 'frozen grape', 'frozen citrus', 'frozen orange', 'frozen lemon', 'frozen lime', 'frozen grapefruit', 'frozen tangerine', 'frozen kiwi', 'frozen tropical fruit', ]
-
-you_probably_have = ['water', 'oil', 'olive oil', 'extra virgin olive oil', 'evoo', 'extra-virgin olive oil', 'cooking oil', 'salt', 'kosher salt', 'sea salt', 'fine salt', 'table salt', 'pepper', 'black pepper', 'salt and pepper', 'salt & pepper', 'kosher salt and black pepper']
-
-# dairy, sauces, canned, baking, snacks, beverages, frozen, misc
-
-grocer_categories = {
-    'you_probably_already_have': [*you_probably_have],
-    'produce': [*fruit, *vegetables],
-    'meat': [*poultry, *red_meat, *game_meat,],
-    'seafood': [*fresh_seafood],
-    'bread': [*bread],
-    'dairy_and_eggs': [*dairy_milks, *alternative_milks, *butter, *yogurt, *sour_creams, *all_cheeses, *eggs],
-    'pantry': [*pastas, *rices, *grains, *canned_fish, *anchovy, *beans, *vinegars, *oils, *all_spices, *sauces, *nuts, *nut_butters, *seeds, *dried_fruits, *dried_berries, *canned, *misc_pantry],
-    'baking': [*baking],
-    'frozen': [*frozen_veggies, *frozen_fruit],
-}
-
 DROPPED_CHARACTERS = ['(', ')', '[', ']', '{', '}', '<', '>', '!', '@', '#', '$', '%', '^', '&', '*', '_', '+', '=', '|', '\\', '/', '?', ',', '.', ':', ';', '"', "'", '`', '~']
 
+# strip the characters we don't want to match on, same treatment for the
+# vocabulary and for incoming ingredient names
+_DROPPED_TABLE = str.maketrans('', '', ''.join(DROPPED_CHARACTERS))
+
+def normalize_ingredient(ingredient):
+  return ingredient.lower().translate(_DROPPED_TABLE).strip()
+
+def build_category_index(categories):
+  '''
+  Build a dict from each normalized vocabulary term to its category. Terms that appear in several categories go to the category listed first.
+  '''
+  index = {}
+  for category, items in categories.items():
+    for item in items:
+      index.setdefault(normalize_ingredient(item), category)
+  return index
+
+# the vocabulary lives in categorizer_vocabulary.py. rather than building it up
+# from all those lists on every import, it's compiled into a binary index file
+# once, and the file is memory mapped on load - so loading is close to free, and
+# every process using it (ie the parse pool's workers) shares the same pages.
+# the file is keyed on a digest of the vocabulary, and recompiled when it changes.
+#
+# file layout, all little endian:
+#   header           magic, format, vocabulary digest, then where each section is
+#   categories       category names in priority order, newline separated
+#   strings          every normalized term, sorted, back to back in utf-8
+#   offsets          u32 start of each term in strings, plus the end of the last
+#   term categories  u8 category number of each term
+#   hash table       u32 slots holding a term number + 1 (0 is empty), open
+#                    addressing with linear probing on the FNV-1a hash of the term
+VOCABULARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'categorizer_vocabulary.py')
+DEFAULT_CATEGORY_INDEX_PATH = os.environ.get(
+  'SHOPPING_LIST_CATEGORY_INDEX',
+  os.path.join(os.path.expanduser('~'), '.cache', 'shopping-list', 'category_index.bin')
+)
+INDEX_MAGIC = b'SLCI'
+INDEX_FORMAT = 1
+# magic, format, digest, categories offset and length, term count, then the
+# offsets of strings, offsets, term categories and the hash table, and its size
+_HEADER = struct.Struct('<4sI32s8I')
+_U32 = struct.Struct('<I')
+
+def fnv1a(data):
+  '''
+  The 32 bit FNV-1a hash of some bytes.
+  '''
+  h = 0x811c9dc5
+  for byte in data:
+    h = ((h ^ byte) * 0x01000193) & 0xffffffff
+  return h
+
+def vocabulary_digest(path = VOCABULARY_PATH):
+  '''
+  Return the digest a compiled index is keyed on - the vocabulary file, plus everything else that changes what gets compiled from it.
+  '''
+  digest = hashlib.sha256(f'{INDEX_FORMAT}\0{DROPPED_CHARACTERS}\0'.encode())
+  with open(path, 'rb') as file:
+    digest.update(file.read())
+  return digest.digest()
+
+def compile_category_index_bytes(categories, digest):
+  '''
+  Compile a vocabulary, a dict of category to its terms in priority order, into the bytes of an index file.
+  '''
+  index = build_category_index(categories)
+  names = list(categories)
+  numbers = {name: number for number, name in enumerate(names)}
+  terms = sorted(index)
+  encoded = [term.encode() for term in terms]
+  offsets = [0]
+  for term in encoded:
+    offsets.append(offsets[-1] + len(term))
+  # at most half full, so probes stay short
+  size = 1
+  while size < 2 * len(terms):
+    size *= 2
+  table = [0] * size
+  for number, term in enumerate(encoded):
+    slot = fnv1a(term) & (size - 1)
+    while table[slot]:
+      slot = (slot + 1) & (size - 1)
+    table[slot] = number + 1
+
+  sections = [
+    '\n'.join(names).encode(),
+    b''.join(encoded),
+    struct.pack(f'<{len(offsets)}I', *offsets),
+    bytes(numbers[index[term]] for term in terms),
+    struct.pack(f'<{size}I', *table),
+  ]
+  positions = []
+  body = bytearray()
+  for section in sections:
+    # keep the u32 arrays aligned
+    body += bytes(-(_HEADER.size + len(body)) % 4)
+    positions.append(_HEADER.size + len(body))
+    body += section
+  header = _HEADER.pack(INDEX_MAGIC, INDEX_FORMAT, digest, positions[0], len(sections[0]), len(terms), *positions[1:], size)
+  return header + bytes(body)
+
+def compile_category_index(path = DEFAULT_CATEGORY_INDEX_PATH):
+  '''
+  Compile categorizer_vocabulary.py into an index file at path. The file is replaced atomically, so processes that already have the old one open keep working.
+
+  Returns
+  -------
+  str
+    The path written to.
+  '''
+  from categorizer_vocabulary import grocer_categories
+  data = compile_category_index_bytes(grocer_categories, vocabulary_digest())
+  directory = os.path.dirname(path)
+  if directory:
+    os.makedirs(directory, exist_ok=True)
+  temporary = f'{path}.{os.getpid()}.tmp'
+  with open(temporary, 'wb') as file:
+    file.write(data)
+  os.replace(temporary, path)
+  return path
+
+class CategoryIndex(Mapping):
+  '''
+  A read only mapping from normalized vocabulary term to category, over the bytes of a compiled index - usually a memory mapped file.
+
+  Parameters
+  ----------
+  data : bytes-like
+    The compiled index, ie from compile_category_index_bytes, or an mmap of an index file.
+  '''
+  def __init__(self, data):
+    if len(data) < _HEADER.size:
+      raise ValueError('Not a category index.')
+    magic, version, digest, categories_at, categories_length, count, strings_at, offsets_at, term_categories_at, table_at, table_size = _HEADER.unpack_from(data)
+    if magic != INDEX_MAGIC or version != INDEX_FORMAT:
+      raise ValueError('Not a category index, or an old format.')
+    self._data = data
+    self._count = count
+    self._strings_at = strings_at
+    self._offsets_at = offsets_at
+    self._term_categories_at = term_categories_at
+    self._table_at = table_at
+    self._mask = table_size - 1
+    self.digest = digest
+    # the categories in priority order - when a term shows up in more than one
+    # category (ie 'quail' is meat and game bird, 'sage' is an herb and a spice)
+    # the category listed first in the vocabulary wins
+    self.categories = bytes(data[categories_at:categories_at + categories_length]).decode().split('\n')
+
+  @classmethod
+  def open(cls, path):
+    '''
+    Memory map the index file at path.
+    '''
+    with open(path, 'rb') as file:
+      return cls(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+  def _term_bytes(self, number):
+    start, end = struct.unpack_from('<2I', self._data, self._offsets_at + 4 * number)
+    return self._data[self._strings_at + start:self._strings_at + end]
+
+  def _find(self, term):
+    encoded = term.encode()
+    slot = fnv1a(encoded) & self._mask
+    while True:
+      entry = _U32.unpack_from(self._data, self._table_at + 4 * slot)[0]
+      if not entry:
+        return -1
+      if self._term_bytes(entry - 1) == encoded:
+        return entry - 1
+      slot = (slot + 1) & self._mask
+
+  def get(self, term, default = None):
+    number = self._find(term)
+    if number < 0:
+      return default
+    return self.categories[self._data[self._term_categories_at + number]]
+
+  def __getitem__(self, term):
+    category = self.get(term)
+    if category is None:
+      raise KeyError(term)
+    return category
+
+  def __contains__(self, term):
+    return isinstance(term, str) and self._find(term) >= 0
+
+  def __len__(self):
+    return self._count
+
+  # in sorted order
+  def __iter__(self):
+    for number in range(self._count):
+      yield bytes(self._term_bytes(number)).decode()
+
+def load_category_index(path = DEFAULT_CATEGORY_INDEX_PATH):
+  '''
+  Memory map the compiled index at path, compiling it first if it's missing or the vocabulary has changed since. If the file can't be written, the index is compiled into memory instead.
+
+  Returns
+  -------
+  CategoryIndex
+  '''
+  digest = vocabulary_digest()
+  try:
+    index = CategoryIndex.open(path)
+    if index.digest == digest:
+      return index
+  except (OSError, ValueError):
+    pass
+  try:
+    compile_category_index(path)
+    return CategoryIndex.open(path)
+  # a cache that can't be written to shouldn't stop anyone making a list
+  except (OSError, ValueError):
+    from categorizer_vocabulary import grocer_categories
+    return CategoryIndex(compile_category_index_bytes(grocer_categories, digest))
+
+# loading the index can mean compiling it and writing it out, which importing
+# this module shouldn't do, so it's loaded the first time something looks a name
+# up. it's still there as CATEGORY_INDEX (and CATEGORY_PRIORITY), see __getattr__
+_category_index = None
+_category_priority = None
+_index_lock = threading.Lock()
+
+def get_category_index():
+  '''
+  Return the category index, loading it from DEFAULT_CATEGORY_INDEX_PATH on first use (see load_category_index).
+  '''
+  global _category_index, _category_priority
+  if _category_index is None:
+    with _index_lock:
+      if _category_index is None:
+        index = load_category_index(DEFAULT_CATEGORY_INDEX_PATH)
+        _category_priority = {category: rank for rank, category in enumerate(index.categories)}
+        _category_index = index
+  return _category_index
+
+def get_category_priority():
+  '''
+  Return each category's rank, from the index's category order - lower ranks win ties.
+  '''
+  get_category_index()
+  return _category_priority
+
+def lookup_category(term):
+  '''
+  Look up a single normalized term, as is or singularized, in the category index. If both forms are found in different categories the higher priority category wins. Returns None if neither form is found.
+  '''
+  index = get_category_index()
+  found = [index.get(term), index.get(singularize(term))]
+  found = [category for category in found if category]
+  if not found:
+    return None
+  return min(found, key=_category_priority.get)
+
+def is_known_ingredient(name):
+  '''
+  Return whether an ingredient name is in the vocabulary as it's written, singularized or pluralized.
+  '''
+  term = normalize_ingredient(name)
+  return any(lookup_category(form) is not None for form in dict.fromkeys([term, pluralize(term)]))
+
+# the same names come up in nearly every recipe, so results are cached on the
+# raw name. the unit isn't used yet - if it ever is, it needs to go in the key
+CATEGORY_CACHE = LRUCache(maxsize=4096)
+BROAD_CATEGORY_CACHE = LRUCache(maxsize=4096)
+
+def category_cache_info():
+  '''
+  Return the CacheInfo (hits, misses, evictions, maxsize, currsize) for the exact and broad categorization caches.
+  '''
+  return {'exact': CATEGORY_CACHE.info(), 'broad': BROAD_CATEGORY_CACHE.info()}
+
 #TODO: cases where unit influences category
 #TODO: preferred returns etc etc.
 #TODO: categorize an ingredient within an or statement or other detail
@@ -172,34 +293,216 @@ DROPPED_CHARACTERS = ['(', ')', '[', ']', '{', '}', '<', '>', '!', '@', '#', '$'
 # "parmesan or pecorino" -> 'cheese'
 # fresh flat-leaf parsley or dill leaves and fine stems -> 'produce'
 def categorize_ingredient(ingredient, unit = None):
-  ingredient = ingredient.lower()
-  for char in DROPPED_CHARACTERS:
-    ingredient = ingredient.replace(char, '')
+  category = CATEGORY_CACHE.get(ingredient)
+  if category is None:
+    category = _categorize_exactly(ingredient)
+    CATEGORY_CACHE.put(ingredient, category)
+  return category
+
+def _categorize_exactly(ingredient):
+  ingredient = normalize_ingredient(ingredient)
   if ' or ' in ingredient:
     split = ingredient.split(' or ') + [ingredient]
   else:
     split = [ingredient]
   for i in split:
-    i = i.strip()
-    for category, items in grocer_categories.items():
-      if i in items or singularize(i) in items:
-        return category
+    category = lookup_category(i.strip())
+    if category:
+      return category
+  return 'misc'
+
+class TermMatcher:
+  '''
+  An Aho-Corasick automaton over a fixed set of terms, which finds every term that occurs in a string in one pass over the string, however many terms there are.
+
+  Matches only count on word boundaries, so 'pepper' is found in 'red-pepper flakes' but 'pea' is not found in 'peanut'.
+
+  Parameters
+  ----------
+  terms : iterable of str
+    The terms to match, already normalized.
+  '''
+  def __init__(self, terms):
+    self._terms = []
+    # node 0 is the root. each node has its transitions, its failure link, and
+    # the indexes of the terms that end at it (including via failure links)
+    self._goto = [{}]
+    self._fail = [0]
+    self._out = [[]]
+    for term in dict.fromkeys(terms):
+      if term:
+        self._add_term(term)
+    self._link()
+
+  def _add_term(self, term):
+    node = 0
+    for char in term:
+      if char not in self._goto[node]:
+        self._goto.append({})
+        self._fail.append(0)
+        self._out.append([])
+        self._goto[node][char] = len(self._goto) - 1
+      node = self._goto[node][char]
+    self._out[node].append(len(self._terms))
+    self._terms.append(term)
+
+  # breadth first, so a node's failure link is always resolved before its children
+  def _link(self):
+    queue = list(self._goto[0].values())
+    for node in queue:
+      for char, child in self._goto[node].items():
+        queue.append(child)
+        fail = self._fail[node]
+        while fail and char not in self._goto[fail]:
+          fail = self._fail[fail]
+        self._fail[child] = self._goto[fail].get(char, 0)
+        self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+  def find_all(self, text):
+    '''
+    Return a list of (start, end, term) for every term found in text on word boundaries.
+    '''
+    matches = []
+    node = 0
+    for end, char in enumerate(text, 1):
+      while node and char not in self._goto[node]:
+        node = self._fail[node]
+      node = self._goto[node].get(char, 0)
+      for term_index in self._out[node]:
+        term = self._terms[term_index]
+        start = end - len(term)
+        if _is_boundary(text, start - 1) and _is_boundary(text, end):
+          matches.append((start, end, term))
+    return matches
+
+def _is_boundary(text, index):
+  return index < 0 or index >= len(text) or not text[index].isalnum()
+
+# building the automaton means walking the whole vocabulary, and it's only
+# needed when an exact lookup misses, so it's built on first use
+_term_matcher = None
+# the warm up thread builds these while the app may be asking for them, so
+# they're only ever built once
+_lazy_lock = threading.Lock()
+
+def get_term_matcher():
+  global _term_matcher
+  if _term_matcher is None:
+    with _lazy_lock:
+      if _term_matcher is None:
+        _term_matcher = TermMatcher(get_category_index())
+  return _term_matcher
+
+# the index, the vocabulary itself and the automaton are still there as module
+# attributes
+def __getattr__(name):
+  if name == 'CATEGORY_INDEX':
+    return get_category_index()
+  if name == 'CATEGORY_PRIORITY':
+    return get_category_priority()
+  if name == 'TERM_MATCHER':
+    return get_term_matcher()
+  if name == 'grocer_categories':
+    from categorizer_vocabulary import grocer_categories
+    return grocer_categories
+  raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+# broad matching catches the or statements and extra detail above, ie
+# 'grated parmesan or pecorino romano' -> 'dairy_and_eggs'. exact lookup is
+# tried first, then every vocabulary term found in the name is a candidate and
+# the longest one wins, so 'red-pepper flakes' beats 'pepper'. ties go to the
+# higher priority category.
+def categorize_ingredient_broadly(ingredient, unit = None):
+  category = BROAD_CATEGORY_CACHE.get(ingredient)
+  if category is None:
+    category = _categorize_broadly(ingredient)
+    BROAD_CATEGORY_CACHE.put(ingredient, category)
+  return category
+
+def _categorize_broadly(ingredient):
+  category = _categorize_exactly(ingredient)
+  if category != 'misc':
+    return category
+  normalized = normalize_ingredient(ingredient)
+  candidates = []
+  for text in [normalized] + [singularize(i.strip()) for i in normalized.split(' or ')]:
+    candidates += get_term_matcher().find_all(text)
+  if not candidates:
+    return _categorize_fuzzily(ingredient)
+  index = get_category_index()
+  best = min(candidates, key=lambda match: (-len(match[2]), _category_priority[index[match[2]]], match[0]))
+  return index[best[2]]
+
+# names a letter or two off from a vocabulary term ('jalepeno') miss both of the
+# lookups above. as a last resort the broad lookup tries a trigram index of the
+# vocabulary - only once the other lookups have missed, with a time budget per
+# name, and only taking a candidate that's a typo or two away, scores at least
+# FUZZY_ACCEPT and is clearly better than the next best. a short name a letter
+# off is usually just another word ('wine', 'wing'), and so is a longer one with
+# a close second ('sherry' is as near 'sherry vinegar' as 'cherry'), so those
+# are left as misc rather than turned into wrong categories
+FUZZY_THRESHOLD = 0.5
+FUZZY_ACCEPT = 0.6
+FUZZY_MARGIN = 0.1
+FUZZY_BUDGET = 0.002
+_fuzzy_index = None
+
+def get_fuzzy_index():
+  global _fuzzy_index
+  if _fuzzy_index is None:
+    with _lazy_lock:
+      if _fuzzy_index is None:
+        _fuzzy_index = TrigramIndex(get_category_index())
+  return _fuzzy_index
+
+def allowed_typos(term):
+  '''
+  Return how many typos a name can have and still be taken for another - none for names under 6 letters, where a typo makes a different word as often as not.
+  '''
+  if len(term) < 6:
+    return 0
+  if len(term) < 8:
+    return 1
+  return 2
+
+def is_typo_of(term, candidate):
+  '''
+  Return whether term is within allowed_typos of candidate, going by the shorter of the two.
+  '''
+  typos = allowed_typos(min(term, candidate, key=len))
+  return typos > 0 and edit_distance(term, candidate, typos) <= typos
+
+def fuzzy_lookup(term, index = None):
+  '''
+  Find the term in a trigram index (by default the vocabulary's) that a normalized term is most likely a misspelling of.
+
+  Parameters
+  ----------
+  term : str
+    The normalized term to look up.
+  index : TrigramIndex, optional
+    The index to look in. Default is the vocabulary's.
+
+  Returns
+  -------
+  list
+    The (term, score) candidates that are a typo or two away, best first. Empty if there are none.
+  '''
+  index = index if index is not None else get_fuzzy_index()
+  candidates = index.search(term, threshold=FUZZY_THRESHOLD, budget=FUZZY_BUDGET)
+  return [(candidate, score) for candidate, score in candidates if is_typo_of(term, candidate)]
+
+def _categorize_fuzzily(ingredient):
+  ingredient = normalize_ingredient(ingredient)
+  for text in dict.fromkeys([ingredient, singularize(ingredient)]):
+    candidates = get_fuzzy_index().search(text, threshold=FUZZY_THRESHOLD, budget=FUZZY_BUDGET)
+    if not candidates:
+      continue
+    best, score = candidates[0]
+    runner_up = candidates[1][1] if len(candidates) > 1 else 0
+    if score >= FUZZY_ACCEPT and score - runner_up >= FUZZY_MARGIN and is_typo_of(text, best):
+      return get_category_index()[best]
   return 'misc'
 
-# this is probably better, but needs distinction in the data for terms that
-# are too broad like 'pepper' with match 'green pepper' and 'red-pepper flakes'
-# and screw up the categorization. but this catches the above or statements
-# ultimately, going to have to write something that has a confidence value maybe
-# def categorize_ingredient_broadly(ingredient, unit = None):
-#   ingredient = ingredient.lower()
-#   for char in DROPPED_CHARACTERS:
-#     ingredient = ingredient.replace(char, '')
-#   split = [ingredient] + ingredient.split(' or ')
-#   for i in split:
-#     i = i.strip()
-#     for category, items in grocer_categories.items():
-#       for item in items:
-#         if item in i or item in singularize(i):
-#           print(f'{ingredient} -> {category}')
-#           return category
-#   return 'misc'
\ No newline at end of file
+if __name__ == '__main__':
+  print(f'Compiled the category index to {compile_category_index()}.')
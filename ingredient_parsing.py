@@ -0,0 +1,333 @@
+from ingredient_categorizer import lookup_category, normalize_ingredient
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from importlib import metadata
+from utils import UNITS, LRUCache, pluralize_unit
+from fractions import Fraction
+import hashlib
+import os
+import pickle
+import re
+import sqlite3
+import threading
+
+############################################
+# Ingredient Parsing
+############################################
+
+# running the parser's CRF model is the most expensive thing we do per line,
+# and the same sentences come up over and over, so parses are cached in memory
+# and on disk. entries are keyed on the sentence and the parser version, so
+# upgrading ingredient_parser_nlp invalidates them automatically.
+
+PARSER_PACKAGE = 'ingredient_parser_nlp'
+
+# importing ingredient_parser loads NLTK and opens the CRF model, which used to be
+# most of the app's startup time, so it's only imported once something needs it
+def parse_ingredient(text):
+  '''
+  Parse an ingredient sentence with ingredient_parser's model, importing it on first use.
+  '''
+  from ingredient_parser import parse_ingredient as parse_with_model
+  return parse_with_model(text)
+
+try:
+  PARSER_VERSION = metadata.version(PARSER_PACKAGE)
+except metadata.PackageNotFoundError:
+  PARSER_VERSION = 'unknown'
+
+DEFAULT_PARSE_CACHE_PATH = os.environ.get(
+  'SHOPPING_LIST_PARSE_CACHE',
+  os.path.join(os.path.expanduser('~'), '.cache', 'shopping-list', 'parse_cache.sqlite3')
+)
+
+class ParseCache:
+  '''
+  A content addressed cache of parsed ingredient sentences, held in an in-memory LRU in front of an SQLite file.
+
+  Parsed results are pickled on disk, and held in memory as they are, so every hit on the same sentence returns the same object. Nothing changes what it gets back (ShoppingIngredient only reads from it), so results are shared rather than copied - treat them as read-only.
+
+  The SQLite file isn't opened until the cache is first used, so making one (or importing this module) doesn't touch the disk.
+
+  Parameters
+  ----------
+  path : str, optional
+    The SQLite file to persist parses to. If None, the cache is memory only. Default is DEFAULT_PARSE_CACHE_PATH.
+  version : str, optional
+    The parser version that entries are keyed on. Default is the installed ingredient_parser_nlp version.
+  maxsize : int, optional
+    The number of parses to hold in memory. Default is 4096.
+  '''
+  def __init__(self, path = DEFAULT_PARSE_CACHE_PATH, version = PARSER_VERSION, maxsize = 4096):
+    self._version = version
+    self._memory = LRUCache(maxsize)
+    self._lock = threading.Lock()
+    self._path = path
+    self._db = None
+    self._opened = not path
+    self._open_lock = threading.Lock()
+
+  def _database(self):
+    '''
+    Return the SQLite connection, opening it on first use, or None if the cache is memory only.
+    '''
+    if not self._opened:
+      with self._open_lock:
+        if not self._opened:
+          try:
+            self._db = self._open(self._path)
+          # a cache that can't be written to shouldn't stop anyone making a list
+          except (OSError, sqlite3.Error):
+            self._db = None
+          self._opened = True
+    return self._db
+
+  def _open(self, path):
+    directory = os.path.dirname(path)
+    if directory:
+      os.makedirs(directory, exist_ok=True)
+    db = sqlite3.connect(path, check_same_thread=False)
+    db.execute('CREATE TABLE IF NOT EXISTS parses (key TEXT PRIMARY KEY, version TEXT NOT NULL, parsed BLOB NOT NULL)')
+    # drop anything left behind by other parser versions
+    db.execute('DELETE FROM parses WHERE version != ?', (self._version,))
+    db.commit()
+    return db
+
+  @property
+  def version(self):
+    return self._version
+
+  @property
+  def persistent(self):
+    return self._database() is not None
+
+  def key(self, sentence):
+    return hashlib.sha256(f'{self._version}\0{sentence}'.encode()).hexdigest()
+
+  def get(self, sentence):
+    '''
+    Return the cached parse of sentence, shared and read-only, or None if it hasn't been parsed with this parser version.
+    '''
+    key = self.key(sentence)
+    parsed = self._memory.get(key)
+    db = self._database() if parsed is None else None
+    if db is not None:
+      with self._lock:
+        row = db.execute('SELECT parsed FROM parses WHERE key = ?', (key,)).fetchone()
+      if row:
+        # only unpickled when it comes off the disk
+        parsed = pickle.loads(row[0])
+        self._memory.put(key, parsed)
+    return parsed
+
+  def put(self, sentence, parsed):
+    '''
+    Cache the parse of sentence, in memory and on disk.
+    '''
+    key = self.key(sentence)
+    self._memory.put(key, parsed)
+    db = self._database()
+    if db is not None:
+      data = pickle.dumps(parsed, protocol=pickle.HIGHEST_PROTOCOL)
+      try:
+        with self._lock:
+          db.execute('INSERT OR REPLACE INTO parses (key, version, parsed) VALUES (?, ?, ?)', (key, self._version, data))
+          db.commit()
+      except sqlite3.Error:
+        pass
+
+  def info(self):
+    return self._memory.info()
+
+  def clear(self):
+    self._memory.clear()
+    db = self._database()
+    if db is not None:
+      with self._lock:
+        db.execute('DELETE FROM parses')
+        db.commit()
+
+PARSE_CACHE = ParseCache()
+
+# lots of lines are as plain as '2 cups flour' or '3 eggs', and don't need the
+# model at all. those are parsed here into the same structure the model would
+# give. anything the least bit unusual - a name we don't know, an extra word,
+# a comma, capitals - goes to the model as usual.
+FAST_PATH = True
+FAST_PATH_PATTERN = re.compile(r'^(?P<quantity>[1-9]\d*(?: [1-9]\d*/[1-9]\d*)?|[1-9]\d*/[1-9]\d*|\d+\.\d*[1-9]) (?P<rest>[a-z]+(?: [a-z]+)*)$')
+FAST_PATH_UNITS = {unit for pair in UNITS.items() for unit in pair if unit.islower()}
+_fast_path_counts = {'fast': 0, 'model': 0}
+
+# what the fast path gives back - the parts of ingredient_parser's ParsedIngredient
+# the app reads, with the same field names. they're made here rather than from
+# ingredient_parser's own classes, since importing those imports the whole
+# package, NLTK and the model with it, which the fast path is there to avoid
+FastText = namedtuple('FastText', ['text', 'confidence'])
+FastAmount = namedtuple('FastAmount', ['quantity', 'unit', 'text', 'confidence'])
+FastParse = namedtuple('FastParse', ['name', 'amount', 'preparation', 'comment', 'sentence'])
+
+def fast_parse(text):
+  '''
+  Parse a trivially structured ingredient line, '<quantity> [<unit>] <name>', without the model.
+
+  Parameters
+  ----------
+  text : str
+    The ingredient sentence to parse.
+
+  Returns
+  -------
+  FastParse | None
+    The parsed line, with the same fields the model's ParsedIngredient would have, or None if the line isn't simple enough to be sure of.
+  '''
+  match = FAST_PATH_PATTERN.match(text)
+  if not match:
+    return None
+  words = match['rest'].split(' ')
+  unit = ''
+  if words[0] in FAST_PATH_UNITS:
+    # the model singularizes units, and the amount pluralizes them again if needed
+    unit = UNITS[words[0]] if words[0] in UNITS else words[0]
+    words = words[1:]
+  # '3 cloves' or '2 cups pinch' - leave it to the model
+  if not words or words[0] in FAST_PATH_UNITS:
+    return None
+  name = ' '.join(words)
+  if lookup_category(normalize_ingredient(name)) is None:
+    return None
+  quantity = match['quantity']
+  if '/' in quantity:
+    # same rounding the parser uses for fractions
+    quantity = f'{round(float(sum(Fraction(part) for part in quantity.split())), 3):g}'
+  # the model pluralizes the unit unless there's exactly one
+  if quantity != '1':
+    unit = pluralize_unit(unit)
+  return FastParse(
+    name=FastText(text=name, confidence=1.0),
+    amount=(FastAmount(quantity=quantity, unit=unit, text=' '.join((quantity, unit)).strip(), confidence=1.0),),
+    preparation=None,
+    comment=None,
+    sentence=text,
+  )
+
+def _try_fast_path(text):
+  parsed = fast_parse(text) if FAST_PATH else None
+  _fast_path_counts['fast' if parsed else 'model'] += 1
+  return parsed
+
+def fast_path_info():
+  '''
+  Return how many lines were parsed by the fast path and how many went to the parse cache and model, with the fast path's share of all lines.
+  '''
+  total = _fast_path_counts['fast'] + _fast_path_counts['model']
+  return {**_fast_path_counts, 'rate': _fast_path_counts['fast'] / total if total else 0.0}
+
+def reset_fast_path_info():
+  _fast_path_counts['fast'] = _fast_path_counts['model'] = 0
+
+def parse_ingredient_cached(text, cache = None):
+  '''
+  Parse an ingredient sentence, with the fast path if the line is simple enough, otherwise with ingredient_parser, skipping the model entirely if the sentence has been parsed before.
+
+  Parameters
+  ----------
+  text : str
+    The ingredient sentence to parse.
+  cache : ParseCache, optional
+    The cache to use. Default is the module's PARSE_CACHE.
+
+  Returns
+  -------
+  ParsedIngredient | FastParse
+    Shared with the cache and anyone else who parsed the same sentence, so read-only.
+  '''
+  parsed = _try_fast_path(text)
+  if parsed:
+    return parsed
+  cache = PARSE_CACHE if cache is None else cache
+  parsed = cache.get(text)
+  if parsed is None:
+    parsed = parse_ingredient(text)
+    cache.put(text, parsed)
+  return parsed
+
+# a recipe's lines are parsed in parallel across a pool of worker processes.
+# the pool is kept for the whole session so each worker only loads the model
+# once. starting work on the pool costs more than a couple of parses, so small
+# batches are just parsed here.
+PARSE_WORKERS = min(os.cpu_count() or 1, 8)
+MIN_POOL_BATCH = 4
+
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+def _warm_worker():
+  parse_ingredient('1 cup flour')
+
+def _parse_in_worker(text):
+  # exceptions don't always pickle, so errors come back as their message
+  try:
+    return parse_ingredient(text), None
+  except Exception as e:
+    return None, str(e) or type(e).__name__
+
+def get_parse_pool():
+  '''
+  Return the session's parse pool, starting it on first use.
+  '''
+  global _parse_pool
+  with _parse_pool_lock:
+    if _parse_pool is None:
+      _parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS, initializer=_warm_worker)
+    return _parse_pool
+
+def shutdown_parse_pool():
+  global _parse_pool
+  with _parse_pool_lock:
+    if _parse_pool is not None:
+      _parse_pool.shutdown(cancel_futures=True)
+      _parse_pool = None
+
+def parse_ingredients(texts, cache = None):
+  '''
+  Parse a batch of ingredient sentences. Simple lines go through the fast path and sentences that are already cached skip the model, and the rest are parsed across the parse pool when there are enough of them to be worth it.
+
+  Parameters
+  ----------
+  texts : list of str
+    The ingredient sentences to parse.
+  cache : ParseCache, optional
+    The cache to use. Default is the module's PARSE_CACHE.
+
+  Returns
+  -------
+  list
+    For each sentence, in order, either its ParsedIngredient (shared and read-only, as for parse_ingredient_cached) or the Exception raised parsing it.
+  '''
+  cache = PARSE_CACHE if cache is None else cache
+  results = [_try_fast_path(text) or cache.get(text) for text in texts]
+  missing = list(dict.fromkeys(text for text, result in zip(texts, results) if result is None))
+  if not missing:
+    return results
+
+  parsed = None
+  if PARSE_WORKERS > 1 and len(missing) >= MIN_POOL_BATCH:
+    try:
+      parsed = list(get_parse_pool().map(_parse_in_worker, missing))
+    except BrokenProcessPool:
+      shutdown_parse_pool()
+  if parsed is None:
+    parsed = [_parse_in_worker(text) for text in missing]
+
+  done = {}
+  for text, (result, error) in zip(missing, parsed):
+    if error is None:
+      cache.put(text, result)
+      done[text] = result
+    else:
+      done[text] = Exception(error)
+  for i, text in enumerate(texts):
+    if results[i] is None:
+      results[i] = done[text]
+  return results
@@ -1,14 +1,26 @@
-from ingredient_parser import parse_ingredient
-from recipe_scrapers import scrape_me
 from termcolor import colored, cprint
-from simple_term_menu import TerminalMenu
-from utils import convert_to_pint_unit, pluralize, singularize
-from ingredient_categorizer import categorize_ingredient
-from pint import Unit
+from utils import QUANTITY_DENOMINATOR_LIMIT, TrigramIndex, convert_to_pint_unit, format_quantity, get_unit_tables, is_pint_unit, pint_unit, pluralize, singularize, to_fraction, unit_conversion
+from ingredient_categorizer import categorize_ingredient, categorize_ingredient_broadly, fuzzy_lookup, get_term_matcher, is_known_ingredient, vocabulary_digest
+from ingredient_parsing import PARSER_VERSION, parse_ingredient, parse_ingredient_cached, parse_ingredients
+from recipe_fetcher import RecipeFetchError, connection_stats, fetch_recipe, fetch_recipes, read_urls
+from recipe_library import get_library
+from collections import namedtuple
+from itertools import islice
 import copy
+import os
+import sqlite3
+import threading
 
 DEBUG_MODE = False
 
+# load the parser's model, pint and the categorizer in the background while the
+# first menu is up, rather than when the first item is added
+WARM_UP = True
+
+# merge items whose names are a typo apart, ie 'gochujnag' into 'gochujang'. only
+# names the categorizer doesn't know are merged, since its own are spelled right
+FUZZY_MERGE = True
+
 STOP_INPUTS = ['', None, ' ', 'stop', 'exit', 'quit']
 
 # the order I go thru my grocery store!
@@ -31,11 +43,63 @@ WARN = 'yellow'
 INFO = 'cyan'
 GOOD = 'green'
 
+_warm_up_done = threading.Event()
+_warm_up_lock = threading.Lock()
+_warm_up_thread = None
+
+def _warm_up():
+  try:
+    # every one of these loads on first use and is safe to call from two threads
+    # at once, so if the user gets ahead of the warm up they just wait for
+    # whatever is still loading
+    get_unit_tables()
+    singularize('eggs')
+    get_term_matcher()
+    categorize_ingredient_broadly('flour')
+    parse_ingredient('1 cup flour')
+  except Exception:
+    # it's only a head start - anything that failed here fails again, properly, when it's used
+    pass
+  finally:
+    _warm_up_done.set()
+
+def start_warm_up():
+  '''
+  Start loading the parser's model, the pint registry and unit tables, and the categorizer on a background thread, if it hasn't been started already.
+
+  Returns:
+  -------
+  threading.Thread
+    The warm up thread.
+  '''
+  global _warm_up_thread
+  with _warm_up_lock:
+    if _warm_up_thread is None:
+      _warm_up_thread = threading.Thread(target=_warm_up, name='warm-up', daemon=True)
+      _warm_up_thread.start()
+    return _warm_up_thread
+
+def warm_up_ready():
+  '''
+  Return whether the warm up has finished, ie the first parse won't have to wait for anything to load.
+  '''
+  return _warm_up_done.is_set()
+
+# the terminal menu and recipe scraper (which brings lxml, extruct and rdflib with
+# it) are imported where they're used, so importing this module stays quick for
+# scripts and tests that never show a menu or scrape anything
+
 def main():
+  if WARM_UP:
+    start_warm_up()
+  from simple_term_menu import TerminalMenu
   OPTIONS = [
     "Add items to shopping list", 
     "Add ingredients from recipe to shopping list (by URL, works with most recipe pages)", 
+    "Add ingredients from several recipes at once (paste URLs or give a file of them)",
+    "Add ingredients from a saved recipe",
     "Remove items from the shopping list",
+    "Change the yield of a recipe, or remove it",
     "View current shopping list", 
     "Export list and quit",
   ]
@@ -62,15 +126,21 @@ def main():
     elif menu_entry_index == 1:
       add_recipe_by_url(shopping_list)
     elif menu_entry_index == 2:
-      remove_items_from_list(shopping_list)
+      add_recipes_by_urls(shopping_list)
     elif menu_entry_index == 3:
-      view_list(shopping_list)
+      add_saved_recipe_from_library(shopping_list)
     elif menu_entry_index == 4:
+      remove_items_from_list(shopping_list)
+    elif menu_entry_index == 5:
+      change_recipe(shopping_list)
+    elif menu_entry_index == 6:
+      view_list(shopping_list)
+    elif menu_entry_index == 7:
       export_list(shopping_list)
       return 0
 
     # DEBUG OPTIONS
-    elif menu_entry_index == 5:
+    elif menu_entry_index == 8:
       select = item_select(shopping_list.items)
       if select == -1:
         continue
@@ -81,12 +151,28 @@ def main():
       cprint("Exiting...", GOOD)
       break
 
+# what happened to each line given to ShoppingList.add_items
+# status is one of MERGED, APPENDED or FAILED, reason is why a line failed
+AddResult = namedtuple('AddResult', ['line', 'status', 'item', 'reason'])
+MERGED = 'merged'
+APPENDED = 'appended'
+FAILED = 'failed'
+
+# one addition to a list item - source is the title of the recipe it came from
+# (None for items added by hand), item is the ingredient as it was added, before
+# it was multiplied by coeff
+Contribution = namedtuple('Contribution', ['source', 'item', 'coeff'])
+
 class ShoppingList:
   '''
   A class to represent a shopping list.
 
   The shopping list is a collection of ingredients and recipes. It provides methods to add and remove items, and to categorize the items.
 
+  The list keeps its items bucketed by category, and caches each category's rendered section (items cache their own rendered line), so viewing or exporting a big list only re-renders what changed since last time. For that to hold, items should be added, merged and removed through the list's methods.
+
+  The list also remembers what was added to each item and which recipe it came from, so a recipe can be removed or rescaled later by redoing just the items that recipe added to, rather than building the whole list again.
+
   Parameters
   ----------
   items : list, optional
@@ -99,34 +185,64 @@ class ShoppingList:
       raise TypeError("Items must be a list of strings.")
     self._items = list(map(lambda x: ShoppingIngredient(x), items))
     self._recipes = []
-    
-  def __str__(self):
-    lines = []
+    # canonical (singular) name -> item, so finding an item to merge into
+    # doesn't mean scanning and singularizing the whole list
+    self._index = {}
+    # category -> items in that category, in list order
+    self._buckets = {category: [] for category in GROCERY_STORE_ORDER}
+    # category -> its rendered section, and the rendered line of each item in it
+    self._sections = {}
+    # every key the list has held, for finding misspellings of them
+    self._fuzzy = TrigramIndex()
+    # item -> the Contributions it's the sum of, in the order they were added
+    self._contributions = {}
+    # recipe title -> the items it contributed to (a dict as an ordered set)
+    self._recipe_items = {}
     for item in self._items:
-      lines.append(str(item))
-    return '\n'.join(lines)
+      self._index.setdefault(item.key, item)
+      self._fuzzy.add(item.key)
+      self._track(item)
+      self._contribute(item, None, item, 1)
+
+  def __str__(self):
+    return '\n'.join(str(item) for item in self._items)
+
+  def _track(self, item):
+    self._buckets.setdefault(item.category, []).append(item)
+    self._sections.pop(item.category, None)
+
+  def _untrack(self, item):
+    self._buckets[item.category].remove(item)
+    self._changed(item)
+
+  # drop the cached section for an item that was merged into or removed
+  def _changed(self, item):
+    self._sections.pop(item.category, None)
 
   def categorized_items(self):
-    categories = {}
-    for item in self._items:
-      if item.category not in categories:
-        categories[item.category] = []
-      categories[item.category].append(item)
     sorted_categories = {}
     for category in GROCERY_STORE_ORDER:
-      if category in categories:
-        sorted_categories[category] = categories[category]
+      if self._buckets[category]:
+        sorted_categories[category] = list(self._buckets[category])
     return sorted_categories
 
   def string_categorized_items(self):
-    categories = self.categorized_items()
-    lines = []
-    for category, items in categories.items():
-      lines.append(f'{category.upper().replace('_', ' ')}:')
-      for item in items:
-        lines.append(str(item))
-      lines.append('')
-    return '\n'.join(lines)
+    sections = []
+    for category in GROCERY_STORE_ORDER:
+      if not self._buckets[category]:
+        continue
+      bucket = self._buckets[category]
+      section = self._sections.get(category)
+      # an item changed in place since (ie items[0] *= 2) has been re-rendered or
+      # is waiting to be, so its line isn't the one in the section any more
+      if section is not None and any(item._modified or item._rendered is not line for item, line in zip(bucket, section[1])):
+        section = None
+      if section is None:
+        lines = [str(item) for item in bucket]
+        text = '\n'.join([f'{category.upper().replace('_', ' ')}:', *lines, ''])
+        section = self._sections[category] = (text, lines)
+      sections.append(section[0])
+    return '\n'.join(sections)
 
   @property
   def items(self):
@@ -163,18 +279,176 @@ class ShoppingList:
     # bringing together all potential parsing errors
     except Exception as e:
       raise ParseException(f"Couldn't parse that item - {item}.")
+    return self.add_ingredient(new_item, coeff)
+
+  # lines are pulled from the iterable and parsed this many at a time
+  ADD_ITEMS_BATCH_SIZE = 256
+
+  def add_items(self, items, coeff = 1, source = None):
+    '''
+    Given an iterable of strings, parse them in batches and add each one to the list, merging with existing items (or earlier lines) of the same name where possible. Nothing is printed - instead each line gets a result saying what happened to it.
+
+    Parameters:
+    ----------
+    items : iterable of str
+      the strings for the new items to add to the shopping list
+    coeff : int, optional
+      a coefficient by which to multiply the quantity of each item. Default is 1.
+    source : str, optional
+      the title of the recipe the lines come from. Default is None, for items added by hand.
+
+    Returns:
+    -------
+    list of AddResult
+      one per line, in order. status is MERGED, APPENDED or FAILED, item is the list item the line ended up in (None if it failed), and reason is the error message for a failed line.
+    '''
+    results = []
+    items = iter(items)
+    while True:
+      batch = list(islice(items, self.ADD_ITEMS_BATCH_SIZE))
+      if not batch:
+        return results
+      lines = [line.strip() if isinstance(line, str) else '' for line in batch]
+      parsed = parse_ingredients([line for line in lines if line])
+      parsed.reverse()
+      for original, line in zip(batch, lines):
+        if not line:
+          results.append(AddResult(original, FAILED, None, "No item to add."))
+          continue
+        results.append(self._add_parsed(original, line, parsed.pop(), coeff, source))
+
+  def add_ingredients(self, items, coeff = 1, source = None):
+    '''
+    Given an iterable of already built Ingredient objects, ie from a saved recipe's records, add each one to the list, merging with existing items of the same name where possible. Nothing is parsed or categorized.
+
+    Parameters:
+    ----------
+    items : iterable of Ingredient
+      the new items to add to the shopping list
+    coeff : int, optional
+      a coefficient by which to multiply the quantity of each item. Default is 1.
+    source : str, optional
+      the title of the recipe the items come from. Default is None, for items added by hand.
+
+    Returns:
+    -------
+    list of AddResult
+      one per item, in order, as for add_items. line is the item's original sentence.
+    '''
+    results = []
+    for new_item in items:
+      try:
+        status, item = self._add(new_item, coeff, source)
+        results.append(AddResult(new_item.sentence, status, item, None))
+      except Exception as e:
+        results.append(AddResult(new_item.sentence, FAILED, None, str(e)))
+    return results
+
+  def _add_parsed(self, original, line, parsed, coeff, source):
+    try:
+      if isinstance(parsed, Exception):
+        raise ParseException(f"Couldn't parse that item - {original}.")
+      try:
+        new_item = ShoppingIngredient(line, parsed)
+      except Exception as e:
+        raise ParseException(f"Couldn't parse that item - {original}.")
+      status, item = self._add(new_item, coeff, source)
+      return AddResult(original, status, item, None)
+    except Exception as e:
+      return AddResult(original, FAILED, None, str(e))
+
+  def add_ingredient(self, new_item, coeff = 1):
+    '''
+    Given an already parsed Ingredient object, add it to the list of items, adding it to an existing item with the same name if there is one. Return a result code. The list keeps the item itself when appending, or a scaled copy of it if coeff isn't 1.
+
+    Parameters:
+    ----------
+    new_item : Ingredient
+      the new item to add to the shopping list
+    coeff : int, optional
+      a coefficient by which to multiply the quantity of the item. Default is 1.
+
+    Returns:
+    -------
+    int
+      1 if the item is added to an existing item, 0 if it is appended to the list of items
+    '''
+    status, _ = self._add(new_item, coeff)
+    return 1 if status == MERGED else 0
+
+  # the status and the item the list now holds
+  def _add(self, new_item, coeff, source = None):
+    base = new_item
     if coeff != 1:
       new_item = new_item * coeff
-    existing_item = self.existing_item(new_item)
-    if existing_item:
-      return 1
-    self._items.append(new_item)
-    return 0
+    item = self._merge(new_item)
+    if item is not None:
+      self._contribute(item, source, base, coeff)
+      return MERGED, item
+    self._append(new_item)
+    self._contribute(new_item, source, base, coeff)
+    return APPENDED, new_item
+
+  # remember that base, times coeff, went into item. it's copied, since the item
+  # itself is merged into in place, and keyed to match in case it was a misspelling
+  def _contribute(self, item, source, base, coeff):
+    base = base.with_key(item.key) if base.key != item.key else base._copy()
+    self._contributions.setdefault(item, []).append(Contribution(source, base, coeff))
+    if source is not None:
+      self._recipe_items.setdefault(source, {})[item] = None
+
+  # the sum of some contributions, added up in order the same way they were added
+  # to the list. one that can't be scaled (ie a range, '2-3 cloves garlic') is
+  # left as it was added, rather than holding up the rest
+  @staticmethod
+  def _total(contributions):
+    total = None
+    for contribution in contributions:
+      scaled = contribution.item._copy()
+      if contribution.coeff != 1:
+        try:
+          scaled *= contribution.coeff
+        except ValueError:
+          pass
+      if total is None:
+        total = scaled
+      else:
+        total += scaled
+    return total
+
+  # make item the total of its contributions, in place, keeping its place on the
+  # list and its category
+  def _recompute(self, item, total):
+    for field in ShoppingIngredient.__slots__:
+      if field != '_category':
+        setattr(item, field, getattr(total, field))
+    self._changed(item)
+
+  # drop an item that's been taken off the list from the index, its category and
+  # the recipes that contributed to it
+  def _forget(self, item):
+    self._untrack(item)
+    for contribution in self._contributions.pop(item, ()):
+      if contribution.source is not None:
+        self._recipe_items.get(contribution.source, {}).pop(item, None)
+    if self._index.get(item.key) is item:
+      del self._index[item.key]
+      # items passed to the constructor aren't merged, so there may be another
+      for other in self._items:
+        if other.key == item.key:
+          self._index[item.key] = other
+          break
+
+  def _append(self, item):
+    self._items.append(item)
+    self._index.setdefault(item.key, item)
+    self._fuzzy.add(item.key)
+    self._track(item)
  
   # longterm TODO: account for different ways of writing the same ingredient
   def existing_item(self, new_item):
     '''
-    Given a parsed Ingredient object, check if an item with the same name exists in the list of items. If it does, attempt to add the new item to the existing item. Return a result code.
+    Given a parsed Ingredient object, check if an item with the same name (or a name a typo or two away, see _find_misspelling) exists in the list of items. If it does, attempt to add the new item to the existing item, in place. Return a result code.
 
     Parameters:
     ----------
@@ -186,11 +460,46 @@ class ShoppingList:
     bool
       True if the item was added to an existing item, False if it was not
     '''
-    for i in self._items:
-      if singularize(i.name) == singularize(new_item.name):
-        i = i + new_item
-        return True
-    return False
+    item = self._merge(new_item)
+    if item is None:
+      return False
+    self._contribute(item, None, new_item, 1)
+    return True
+
+  # the item new_item was merged into, or None
+  def _merge(self, new_item):
+    i = self._index.get(new_item.key)
+    if i is not None:
+      i += new_item
+      self._changed(i)
+      return i
+    i = self._find_misspelling(new_item)
+    if i is None:
+      return None
+    # a guess that won't add up is just its own item
+    try:
+      i += new_item.with_key(i.key)
+    except ValueError:
+      return None
+    self._changed(i)
+    return i
+
+  # only once there's no exact match, and only between names the categorizer
+  # doesn't know. a name in its vocabulary (in any form) is spelled right, and is
+  # a different thing from any other name, however close ('peas', 'pears' or
+  # 'goat milk', 'oat milk')
+  def _find_misspelling(self, new_item):
+    if not FUZZY_MERGE or is_known_ingredient(new_item.name):
+      return None
+    for candidate, score in fuzzy_lookup(new_item.key, self._fuzzy):
+      # the index keeps keys that have since been removed
+      i = self._index.get(candidate)
+      if i is None:
+        continue
+      if is_known_ingredient(i.name) or is_known_ingredient(candidate):
+        continue
+      return i
+    return None
     
   def remove_item(self, index):
     '''
@@ -206,13 +515,13 @@ class ShoppingList:
     None
     '''
     if index >= 0 and index < len(self._items):
-      del self._items[int(index)]
+      self._forget(self._items.pop(int(index)))
     else:
       raise ValueError("Invalid delete index.")
 
-  def add_recipe(self, recipe):
+  def add_recipe(self, recipe, items = None):
     '''
-    Given a Recipe object, append it to the list of recipes, and add its ingredients to the list of items.
+    Given a Recipe object, append it to the list of recipes, and add its ingredients to the list of items. All of the recipe's ingredients are parsed as one batch, in parallel, then added to the list in their original order.
 
     If a recipe with the same title already exists, don't append it to the list of recipes (but still add its ingredients to the shopping list).
 
@@ -220,6 +529,8 @@ class ShoppingList:
     ----------
     recipe : Recipe
       The recipe to add to the shopping list.
+    items : list of Ingredient, optional
+      The recipe's ingredients, already built (ie from a saved recipe), at the recipe's original yield. If given, these are added instead of parsing the recipe's ingredient lines.
 
     Returns:
     -------
@@ -233,28 +544,142 @@ class ShoppingList:
         exists = True
     if not exists:
       self._recipes.append(recipe)
-    for ingredient in recipe.ingredients:
-      if ingredient:
-        try:
-          self.add_item(ingredient, recipe.coeff)
-        except Exception as e:
-          cprint(e, 'red')
-          issues = True
+    if items is None:
+      results = self.add_items([ingredient for ingredient in recipe.ingredients if ingredient], recipe.coeff, recipe.title)
+    else:
+      results = self.add_ingredients(items, recipe.coeff, recipe.title)
+    for result in results:
+      if result.status == FAILED:
+        cprint(result.reason, 'red')
+        issues = True
     if issues:
       return 1
     return 0
 
+  def _recipe(self, title):
+    for recipe in self._recipes:
+      if recipe.title == title:
+        return recipe
+    raise ValueError(f"There's no recipe called {title} on the list.")
+
+  def remove_recipe(self, title):
+    '''
+    Remove a recipe from the list, and take what it added back off its items. Only the items the recipe added to are touched - each is added up again from what's left of it, and the ones only the recipe added are removed.
+
+    Parameters:
+    ----------
+    title : str
+      The title of the recipe to remove.
+
+    Returns:
+    -------
+    None
+    '''
+    self._recipe(title)
+    # every item is added up before any are changed, so an item that can't be
+    # added up leaves the list as it was
+    updates = []
+    removed = set()
+    for item in self._recipe_items.get(title, {}):
+      remaining = [contribution for contribution in self._contributions[item] if contribution.source != title]
+      if remaining:
+        updates.append((item, remaining, self._total(remaining)))
+      else:
+        removed.add(item)
+    self._recipe_items.pop(title, None)
+    for item, remaining, total in updates:
+      self._contributions[item] = remaining
+      self._recompute(item, total)
+    if removed:
+      self._items = [item for item in self._items if item not in removed]
+      for item in removed:
+        self._forget(item)
+    self._recipes = [recipe for recipe in self._recipes if recipe.title != title]
+
+  def rescale_recipe(self, title, coeff):
+    '''
+    Change the multiplier of a recipe on the list, ie to double it after it's been added. Only the items the recipe added to are touched - each is added up again with the recipe's part at the new multiplier. If the recipe was added more than once, every time it was added is rescaled.
+
+    Parameters:
+    ----------
+    title : str
+      The title of the recipe to rescale.
+    coeff : int | float
+      The recipe's new multiplier, relative to its original yield.
+
+    Returns:
+    -------
+    None
+    '''
+    if type(coeff) != int and type(coeff) != float:
+      raise TypeError("Can only scale a recipe by a number.")
+    if coeff <= 0:
+      raise ValueError("Can only scale a recipe by a number more than zero.")
+    recipe = self._recipe(title)
+    # every item is added up before any are changed, so an item that can't be
+    # scaled leaves the list as it was
+    updates = []
+    for item in self._recipe_items.get(title, {}):
+      contributions = [
+        contribution._replace(coeff=coeff) if contribution.source == title else contribution
+        for contribution in self._contributions[item]
+      ]
+      updates.append((item, contributions, self._total(contributions)))
+    for item, contributions, total in updates:
+      self._contributions[item] = contributions
+      self._recompute(item, total)
+    recipe.coeff = coeff
+
+  @classmethod
+  def combine(cls, shopping_lists):
+    '''
+    Combine several shopping lists, ie a week of recipes or a few households' lists, into a new one. Rather than merging every item into the new list one pair at a time, all the items are merged in one vectorized pass (see aggregation.py), with the same results. Items with the same name whose units can't be added are kept as separate items. The lists passed in aren't changed.
+
+    Each combined item remembers what went into the items it was merged from, so the combined list's recipes can be removed or rescaled like any other list's.
+
+    Parameters:
+    ----------
+    shopping_lists : list of ShoppingList
+      The lists to combine.
+
+    Returns:
+    -------
+    ShoppingList
+      A new list with every list's recipes and their items merged.
+    '''
+    # numpy is only needed for this, so it's only imported when it's used
+    from aggregation import aggregate_ingredient_groups
+    combined = cls()
+    for shopping_list in shopping_lists:
+      for recipe in shopping_list.recipes:
+        if all(existing.title != recipe.title for existing in combined._recipes):
+          # rescaling changes the recipe, so the combined list gets its own
+          combined._recipes.append(copy.copy(recipe))
+    sources = [(shopping_list, item) for shopping_list in shopping_lists for item in shopping_list.items]
+    for item, members in aggregate_ingredient_groups([item for _, item in sources]):
+      # the combined list merges into its items in place, so it gets its own
+      item = item._copy()
+      combined._append(item)
+      # contributions are never changed in place, so they can be shared
+      contributions = [
+        contribution
+        for shopping_list, source in (sources[member] for member in members)
+        for contribution in shopping_list._contributions[source]
+      ]
+      combined._contributions[item] = contributions
+      for contribution in contributions:
+        if contribution.source is not None:
+          combined._recipe_items.setdefault(contribution.source, {})[item] = None
+    return combined
+
 class Recipe:
   def __init__(self, title, ingredients, yields, url, data = None, coeff = 1):
     self._title = title
     self._ingredients = ingredients
-    if coeff != 1:
-      self._yields = yields + f' ({coeff}x ingredients)'
-    else:
-      self._yields = yields
+    self._base_yields = yields
     self._url = url
     self._data = data
-    self._coeff = coeff
+    self.coeff = coeff
 
   def __str__(self):
     lines = [self.title + ' | ' + self.yeilds, self.url]
@@ -272,6 +697,11 @@ class Recipe:
   def yeilds(self):
     return self._yields
 
+  # the yield before any coeff, ie '4 servings'
+  @property
+  def base_yields(self):
+    return self._base_yields
+
   @property
   def url(self):
     return self._url
@@ -284,39 +714,106 @@ class Recipe:
   def coeff(self):
     return self._coeff
 
-# TODO: figure out if I can extend ParsedIngredient class from the lib?
+  # only changes the recipe itself - to rescale a recipe on a shopping list, use
+  # ShoppingList.rescale_recipe
+  @coeff.setter
+  def coeff(self, value):
+    self._coeff = value
+    if value != 1 and self._base_yields is not None:
+      self._yields = self._base_yields + f' ({value}x ingredients)'
+    else:
+      self._yields = self._base_yields
+
+# an ingredient amount - quantity text, unit (a pint Unit where possible, else a
+# string) and the text for display
+Amount = namedtuple('Amount', ['quantity', 'unit', 'text'])
+
+def _amount_from_parsed(amount):
+  # composite amounts ('1 lb 2 oz') only have text
+  return Amount(getattr(amount, 'quantity', ''), getattr(amount, 'unit', ''), amount.text)
+
+# amounts in records keep their unit as text, and whether it was a pint unit
+def _amount_to_record(amount):
+  if amount is None:
+    return None
+  return {'quantity': amount.quantity, 'unit': str(amount.unit), 'pint': is_pint_unit(amount.unit), 'text': amount.text}
+
+def _amount_from_record(record):
+  if record is None:
+    return None
+  unit = pint_unit(record['unit']) if record['pint'] else record['unit']
+  return Amount(record['quantity'], unit, record['text'])
+
 class ShoppingIngredient:
   """
   A class to represent an ingredient.
 
-  Given a string (hopefully an ingredient string, of the sort you'd typically find in the ingredients list on a recipe, which contains some or all of the tokens QUANTITY, UNIT, INGREDIENT, PREPARATION, COMMENT), upon initialization the string will be parsed using the ingredient_parser library and the parsed data is saved privately. The unit will be converted to a Pint unit, if the unit is found in the Pint unit registry. Pint units have a host of useful features including easy conversion to compatible units. The ingredient will also be categorized using the ingredient_categorizer.
+  Given a string (hopefully an ingredient string, of the sort you'd typically find in the ingredients list on a recipe, which contains some or all of the tokens QUANTITY, UNIT, INGREDIENT, PREPARATION, COMMENT), upon initialization the string will be parsed using the ingredient_parser library (or pulled from the parse cache, if the same sentence has been parsed before) and the fields we use are saved privately. The parser's full output is only kept in DEBUG_MODE, so the ingredient itself stays small. The unit will be converted to a Pint unit, if the unit is found in the Pint unit registry. Pint units have a host of useful features including easy conversion to compatible units. The ingredient will also be categorized using the ingredient_categorizer.
   
-  The class provides many properties to access the parsed data, with one property (quantity) being settable, which will also reset the amount text to account for the new quantity. The class also provides overloaded operators for multiplication and addition, which will multiply the quantity of the ingredient by a number or add the quantity of another ingredient to this ingredient, respectively. These operators mutate the first object in place - they do not return a fresh object. I will probably change this soon. There is also a string overload to format the ingredient for printing in a shopping list.
+  The class provides many properties to access the parsed data, with one property (quantity) being settable, which will also reset the amount text to account for the new quantity. Quantities are held as exact fractions, and are only rounded and turned back into text when they're read. The class also provides overloaded operators for multiplication and addition, which will multiply the quantity of the ingredient by a number or add the quantity of another ingredient to this ingredient, respectively. These operators return a new ingredient and leave both operands alone. The new ingredient is a shallow copy - every field it holds is immutable, so it can share whatever didn't change with the original rather than deep copying it. The in place forms, *= and +=, update the ingredient itself, which is what the shopping list uses to merge items. There is also a string overload to format the ingredient for printing in a shopping list.
 
   Parameters
   ----------
   text : str
     The ingredient string to parse and categorize.
+  parsed : ParsedIngredient, optional
+    The already parsed data for text, ie from a batch parse. If not given, text is parsed on initialization.
 
   Operators
   ---------
-  * : Multiply the quantity of the ingredient by a number. Returns the ingredient as is if it has no quantity to multiply.
-  + : Attempt to add the quantity of another ingredient to this ingredient. Names must match, and units must be compatible, which is done either via pint Unit compatability or string matching. The existing ingredient will have its quantity and unit updated to reflect the sum. If two ingredients with compatible but not equal Pint units are added, the unit that results in  the smaller whole magnitude (>= 1) will be used for the sum.
+  * : Multiply the quantity of the ingredient by a number. Returns an unchanged copy if it has no quantity to multiply.
+  + : Attempt to add the quantity of another ingredient to this ingredient. Names must match, and units must be compatible, which is done either via pint Unit compatability or string matching. The result will have its quantity and unit updated to reflect the sum.
+  *=, += : The same, but updating the ingredient in place. If two ingredients with compatible but not equal Pint units are added, the unit that results in  the smaller whole magnitude (>= 1) will be used for the sum.
   """
-  def __init__(self, text):
+  # lists can hold tens of thousands of these, so only what we use is kept
+  __slots__ = (
+    '_sentence', '_name', '_key', '_quantity', '_amount', '_amount_two',
+    '_preparation', '_comment', '_category', '_parsed',
+    '_stale', '_modified', '_rendered',
+  )
+
+  def __init__(self, text, parsed = None):
+    parsed = parsed or parse_ingredient_cached(text)
     self._sentence = text
-    self._parsed = parse_ingredient(text)
-    self._category = categorize_ingredient(self.name)
+    self._name = parsed.name.text
+    self._preparation = parsed.preparation.text if parsed.preparation else None
+    self._comment = parsed.comment.text if parsed.comment else None
+    self._amount = _amount_from_parsed(parsed.amount[0]) if parsed.amount else None
+    self._amount_two = _amount_from_parsed(parsed.amount[1]) if len(parsed.amount) > 1 else None
+    # the raw parser output is only worth its memory when debugging
+    self._parsed = parsed if DEBUG_MODE else None
+    # the exact quantity, or None if there isn't a single number to work with.
+    # when it changes, the amount text isn't rebuilt until it's next read
+    self._quantity = None
+    self._stale = False
+    if self._amount and self._amount.quantity:
+      try:
+        self._quantity = to_fraction(self._amount.quantity)
+      except ValueError:
+        pass
+    self._category = categorize_ingredient_broadly(self._name)
+    # the name gets pluralized as the quantity changes, the key doesn't
+    self._key = singularize(self._name)
+    # set whenever the amount or name changes, which makes the cached
+    # rendering stale
     self._modified = False
+    self._rendered = None
     # convert unit to pint unit for easy conversion and comparison
     try:
-      if self._parsed.amount:
-        self._parsed.amount[0].unit = convert_to_pint_unit(self._parsed.amount[0].unit)
+      if self._amount:
+        self._amount = self._amount._replace(unit=convert_to_pint_unit(self._amount.unit))
     except Exception as e:
       cprint(e, ERR)
 
-  # string overload formats the ingredient
+  # string overload formats the ingredient, which is only done again when it has
+  # been modified since it was last formatted
   def __str__(self):
+    if self._rendered is None or self._modified:
+      self._rendered = self._render()
+      self._modified = False
+    return self._rendered
+
+  def _render(self):
     text = self.name
     if self.amount:
       text = text + ', ' + self.amount.text
@@ -332,53 +829,137 @@ class ShoppingIngredient:
       text = text + ' (' + ", ".join(paren_text) + ')'
     return text
 
-  # longterm TODO: smarter units - conversion, preferred unit for shopping, etc
-  # Returns the ingredient as is if it has no quantity to multiply
+  # a copy matched up under another key, ie to merge a misspelled name into the
+  # right one
+  def with_key(self, key):
+    new = self._copy()
+    new._key = key
+    return new
+
+  # a new ingredient sharing this one's fields. they're all immutable (strings,
+  # fractions, pint units and namedtuples), so there's nothing to deep copy
+  def _copy(self):
+    new = object.__new__(ShoppingIngredient)
+    for field in ShoppingIngredient.__slots__:
+      setattr(new, field, getattr(self, field))
+    return new
+
+  def to_record(self):
+    '''
+    Return the ingredient as a record of plain, JSON friendly values, which from_record turns back into the same ingredient without parsing or categorizing anything.
+    '''
+    return {
+      'sentence': self._sentence,
+      'name': self.name,
+      'key': self._key,
+      'quantity': str(self._quantity) if self._quantity is not None else None,
+      'amount': _amount_to_record(self.amount),
+      'amount_two': _amount_to_record(self._amount_two),
+      'preparation': self._preparation,
+      'comment': self._comment,
+      'category': self._category,
+    }
+
+  @classmethod
+  def from_record(cls, record):
+    '''
+    Build an ingredient from a record made by to_record.
+    '''
+    new = object.__new__(cls)
+    new._sentence = record['sentence']
+    new._name = record['name']
+    new._key = record['key']
+    new._quantity = to_fraction(record['quantity']) if record['quantity'] is not None else None
+    new._amount = _amount_from_record(record['amount'])
+    new._amount_two = _amount_from_record(record['amount_two'])
+    new._preparation = record['preparation']
+    new._comment = record['comment']
+    new._category = record['category']
+    new._parsed = None
+    new._stale = False
+    new._modified = False
+    new._rendered = None
+    return new
+
   def __mul__(self, other):
+    new = self._copy()
+    new *= other
+    return new
+
+  def __add__(self, other):
+    new = self._copy()
+    new += other
+    return new
+
+  # longterm TODO: smarter units - conversion, preferred unit for shopping, etc
+  # Leaves the ingredient as is if it has no quantity to multiply
+  def __imul__(self, other):
     if type(other) != int and type(other) != float:
       raise TypeError("Can only multiply an Ingredient by a number.")
     if self.amount:
       if self.quantity:
-        coeff = float(other)
-        self.quantity = str(f'{(float(self.quantity) * coeff):.3g}')
-        self._modified = True
+        if self._quantity is None:
+          raise ValueError(f"Can't multiply the quantity {self.quantity} of {self.name}.")
+        self._set_quantity(self._quantity * to_fraction(other))
     return self
 
-  def __add__(self, other):
-    # TODO: implement this so that it returns a new object, not mutate the existing one
-    # new_ingredient = copy.deepcopy(self)
+  def __iadd__(self, other):
     if type(other) != ShoppingIngredient:
       raise TypeError("Can only add an Ingredient to an Ingredient.")
-    if singularize(self.name) != singularize(other.name):
+    if self.key != other.key:
       raise ValueError("Can only add ingredients with the same name.")
-    if not self.quantity or not other.quantity:
+    if self._quantity is None or other._quantity is None:
       raise ValueError("Both ingredients must have a quantity to add them.")
     if other.amount_two:
       raise ValueError("Can't add ingredient with secondary amounts. This will be implemented in the future.")
-    if type(self.unit) == Unit and type(other.unit) == Unit:
-      if self.unit.is_compatible_with(other.unit):
-        a = self.unit * float(self.quantity)
-        b = other.unit * float(other.quantity)
+    if is_pint_unit(self.unit) and is_pint_unit(other.unit):
+      a = unit_conversion(self.unit)
+      b = unit_conversion(other.unit)
+      if self.unit == other.unit:
+        self._set_quantity(self._quantity + other._quantity)
+      elif a and b and a.dimension == b.dimension:
+        # plain float math through the precomputed base unit factors
+        total = float(self._quantity) * a.factor + float(other._quantity) * b.factor
+        in_self = total / a.factor
+        in_other = total / b.factor
+        if in_self > in_other and in_other >= 1:
+          self.unit = other.unit
+          self._set_converted_quantity(in_other)
+        else:
+          self._set_converted_quantity(in_self)
+      # units we don't have in the table go through pint
+      elif not (a and b) and self.unit.is_compatible_with(other.unit):
+        a = self.unit * float(self._quantity)
+        b = other.unit * float(other._quantity)
         c = a + b
         if c.magnitude > c.to(other.unit).magnitude and c.to(other.unit).magnitude >= 1:
-          self.unit = copy.deepcopy(other.unit)
-          self.quantity = str(c.to(other.unit).magnitude)
+          self.unit = other.unit
+          self._set_converted_quantity(c.to(other.unit).magnitude)
         else:
-          self.quantity = str(c.magnitude)
+          self._set_converted_quantity(c.magnitude)
       else:
         raise ValueError(f"Can't add ingredients with incompatible units. Attempted to add {self.unit} and {other.unit} for {self.name}. Such conversions will be implemented in the future.")
-    elif type(self.unit) == str and type(other.unit) == str:
-      if self.unit == other.unit:
-        self.quantity = str(float(self.quantity) + float(other.quantity))
+    elif type(self.unit) == str and type(other.unit) == str and self.unit and other.unit:
+      # the same unit however it's written ('slice', 'slices'), but nothing to
+      # convert between different ones ('clove', 'head')
+      if singularize(self.unit) != singularize(other.unit):
+        raise ValueError(f"Can't add ingredients with different units. Attempted to add {self.unit} and {other.unit} for {self.name}.")
+      self._set_quantity(self._quantity + other._quantity)
     elif not self.unit and not other.unit:
-      self.quantity = str(float(self.quantity) + float(other.quantity))
+      self._set_quantity(self._quantity + other._quantity)
     else:
       raise ValueError(f"Can't add ingredients with incompatible units. Attempted to add {self.unit} and {other.unit} for {self.name}. Such conversions will be implemented in the future.")
     return self
 
   @property
   def name(self):
-    return self._parsed.name.text
+    self._sync()
+    return self._name
+
+  # the canonical name used to match up the same ingredient
+  @property
+  def key(self):
+    return self._key
 
   @property
   def sentence(self):
@@ -388,16 +969,13 @@ class ShoppingIngredient:
   # and that the second one doesn't change when multiplying etc
   @property
   def amount(self):
-    if self._parsed.amount:
-      return self._parsed.amount[0]
-    return None
+    self._sync()
+    return self._amount
 
   # seen this used for sizing pieces of meat, good info for parenthetical
   @property
   def amount_two(self):
-    if len(self._parsed.amount) > 1:
-      return self._parsed.amount[1]
-    return None
+    return self._amount_two
 
   @property
   def unit(self):
@@ -409,8 +987,10 @@ class ShoppingIngredient:
   @unit.setter
   def unit(self, value):
     if self.amount:
-      self._parsed.amount[0].unit = value
+      self._amount = self._amount._replace(unit=value)
+      self._stale = True
       self._modified = True
+      self._rendered = None
 
   @property
   def quantity(self):
@@ -421,22 +1001,42 @@ class ShoppingIngredient:
   @quantity.setter
   def quantity(self, value):
     if self.amount and self.quantity:
-      self._parsed.amount[0].quantity = f'{float(value):.3g}'
-      new_text = []
-      new_text.append(self.quantity)
-      if self.unit:
-        new_text.append(pluralize(str(self.unit), float(self.quantity)))
-      else:
-        self._parsed.name.text = pluralize(self.name, float(self.quantity))
-      self._parsed.amount[0].text = ' '.join(new_text)
-      self._modified = True
+      self._set_quantity(to_fraction(value))
 
+  # the exact quantity, as a Fraction
+  @property
+  def quantity_value(self):
+    return self._quantity
+
+  def _set_quantity(self, value):
+    self._quantity = value
+    self._stale = True
+    self._modified = True
+    self._rendered = None
+
+  # for sums that went through a unit conversion, which come back as floats
+  def _set_converted_quantity(self, value):
+    self._set_quantity(to_fraction(value).limit_denominator(QUANTITY_DENOMINATOR_LIMIT))
+
+  # rebuild the amount text, and for amounts without a unit the plurality of the
+  # name, from the exact quantity. only done when they're read after a change
+  def _sync(self):
+    if not self._stale:
+      return
+    self._stale = False
+    if self._quantity is None:
+      return
+    quantity = format_quantity(self._quantity)
+    new_text = [quantity]
+    if self._amount.unit:
+      new_text.append(pluralize(str(self._amount.unit), float(quantity)))
+    else:
+      self._name = pluralize(self._name, float(quantity))
+    self._amount = self._amount._replace(quantity=quantity, text=' '.join(new_text))
 
   @property
   def preparation(self):
-    if self._parsed.preparation:
-      return self._parsed.preparation.text
-    return None
+    return self._preparation
 
   @property
   def category(self):
@@ -444,10 +1044,9 @@ class ShoppingIngredient:
 
   @property
   def comment(self):
-    if self._parsed.comment:
-      return self._parsed.comment.text
-    return None
+    return self._comment
 
+  # the raw parser output, only kept in DEBUG_MODE
   @property
   def parsed(self):
     return self._parsed
@@ -457,6 +1056,7 @@ class ParseException(Exception):
   pass
 
 def item_select(items):
+  from simple_term_menu import TerminalMenu
   names = [str(item) for item in items]
   item_menu = TerminalMenu([*names, "Back"])
   menu_entry_index = item_menu.show()
@@ -471,19 +1071,32 @@ def add_recipe_by_url(shopping_list):
   if url in STOP_INPUTS:
     return
   try: 
-    scraper = scrape_me(url)
-  except: 
+    scraped = fetch_recipe(url)
+  except RecipeFetchError: 
     cprint("Couldn't find or parse the recipe at that URL. Please try a different one!", ERR)
     return
-  coeff = 1
-  if scraper.yields() != None:
-    title_text = colored(scraper.title(), GOOD, attrs=['reverse'])
-    servings_text = colored(scraper.yields(), GOOD, attrs=['reverse'])
+  coeff = choose_coeff(scraped.title, scraped.yields)
+  new_recipe = Recipe(scraped.title, scraped.ingredients, scraped.yields, url, scraped, coeff)
+  result = shopping_list.add_recipe(new_recipe)
+  save_recipe(new_recipe)
+  if result == 1:
+    cprint(f"There were issues adding some ingredients from the recipe. The shopping list now has {shopping_list.length} items", WARN)
+  else:
+    cprint(f"Added items from recipe. The shopping list now has {shopping_list.length} items.", GOOD)
+
+# asks whether to scale a recipe (if we know what it yields), returns the coefficient.
+# current is the recipe's multiplier so far, which 'No change' keeps
+def choose_coeff(title, yields, current = 1):
+  from simple_term_menu import TerminalMenu
+  coeff = current
+  if yields != None:
+    title_text = colored(title, GOOD, attrs=['reverse'])
+    servings_text = colored(yields, GOOD, attrs=['reverse'])
     print(f'Mmmm, {title_text}. It looks like this recipe yields {servings_text}.\nWould you like to modify the yield (ie double, halve, etc) ')
     coeff_menu = TerminalMenu(['No change', 'Halve', 'Double', 'Triple', 'Custom'])
-    coeffs = [1, 0.5, 2, 3]
+    coeffs = [current, 0.5, 2, 3]
     coeff_index = coeff_menu.show()
-    if coeff_index < 4:
+    if coeff_index is not None and coeff_index < 4:
       coeff = coeffs[coeff_index]
     elif coeff_index == 4:
       while True:
@@ -491,15 +1104,199 @@ def add_recipe_by_url(shopping_list):
           coeff = float(input("Enter the desired multiplier: "))
           if coeff <= 0:
             raise ValueError
-          if coeff == 1:
+          if coeff == current:
             cprint("No change made.", GOOD)
           if coeff > 100:
             raise ValueError
           break
         except:
           cprint("Not a valid coefficient. Enter a number more than zero and less than 100.", ERR)
-  new_recipe = Recipe(scraper.title(), scraper.ingredients(), scraper.yields(), url, scraper, coeff)
-  result = shopping_list.add_recipe(new_recipe)
+  return coeff
+
+# Add ingredients from a batch of recipes
+# reads pasted URLs (or a file of them), fetches them all at once, and adds them
+# in the order given
+def add_recipes_by_urls(shopping_list):
+  print("Paste the recipe URLs, one per line, then enter nothing to start importing. Or enter the path of a file of URLs.")
+  lines = []
+  while True:
+    line = input()
+    if line in STOP_INPUTS:
+      break
+    lines.append(line)
+  if not lines:
+    return
+  text = '\n'.join(lines)
+  if len(lines) == 1 and os.path.isfile(lines[0].strip()):
+    try:
+      with open(lines[0].strip()) as file:
+        text = file.read()
+    except OSError as e:
+      cprint(f"Couldn't read that file - {e}", ERR)
+      return
+  urls = read_urls(text)
+  if not urls:
+    cprint("Didn't find any URLs to import.", ERR)
+    return
+  cprint(f"Fetching {len(urls)} recipes...", INFO)
+  results = import_recipes(shopping_list, urls)
+  failures = [result for result in results if result.error]
+  if failures:
+    cprint(f"Couldn't import {len(failures)} of {len(urls)} recipes:", WARN)
+    for result in failures:
+      cprint(f"  {result.url} - {result.error}", WARN)
+  cprint(f"Added items from {len(urls) - len(failures)} recipes. The shopping list now has {shopping_list.length} items.", GOOD)
+  if DEBUG_MODE:
+    for host, stats in connection_stats().items():
+      cprint(f"  {host} - {stats.requests} requests on {stats.connections} connections ({stats.reused} reused)", INFO)
+
+def import_recipes(shopping_list, urls, library = None, **options):
+  '''
+  Fetch several recipes at once and add each one that was found to the shopping list, in the order given, at its original yield. Each recipe is saved to the recipe library too.
+
+  Parameters:
+  ----------
+  shopping_list : ShoppingList
+    The list to add the recipes to.
+  urls : list of str
+    The recipe pages.
+  library : RecipeLibrary, optional
+    The library to save the recipes to. Default is the user's library.
+  options
+    Passed on to recipe_fetcher.fetch_recipes, ie max_workers and timeout.
+
+  Returns:
+  -------
+  list of FetchResult
+    What happened to each URL, in the order given.
+  '''
+  results = fetch_recipes(urls, **options)
+  for result in results:
+    if result.recipe:
+      recipe = Recipe(result.recipe.title, result.recipe.ingredients, result.recipe.yields, result.url, result.recipe)
+      shopping_list.add_recipe(recipe)
+      save_recipe(recipe, library)
+  return results
+
+############################################
+# Saved Recipes
+############################################
+
+# recipes are saved to the library (see recipe_library.py) as they're added, with
+# their ingredients as records, so adding one again skips scraping and parsing.
+# records are rebuilt from the recipe's lines if anything they depend on changes.
+# a line that couldn't be parsed is kept as a record of why, so it isn't lost.
+RECORD_FORMAT = 2
+# the vocabulary's digest is the one the category index is compiled under, and
+# is worked out from the vocabulary file without loading the index
+RECORD_VERSION = f'{RECORD_FORMAT}/{PARSER_VERSION}/{vocabulary_digest().hex()}'
+
+def ingredient_records(lines):
+  '''
+  Parse ingredient lines into records for the library, see ShoppingIngredient.to_record. A line that can't be parsed gets a record of just its sentence and why it failed, {'sentence': line, 'failed': reason}, so there's still one record per line.
+  '''
+  lines = [line.strip() for line in lines if line and line.strip()]
+  records = []
+  for line, parsed in zip(lines, parse_ingredients(lines)):
+    try:
+      if isinstance(parsed, Exception):
+        raise parsed
+      records.append(ShoppingIngredient(line, parsed).to_record())
+    except Exception:
+      records.append({'sentence': line, 'failed': f"Couldn't parse that item - {line}."})
+  return records
+
+def save_recipe(recipe, library = None):
+  '''
+  Save a recipe to the library at its original yield, with its ingredients parsed and categorized, replacing the one saved from the same URL if there is one.
+
+  Parameters:
+  ----------
+  recipe : Recipe
+    The recipe to save.
+  library : RecipeLibrary, optional
+    The library to save it to. Default is the user's library.
+
+  Returns:
+  -------
+  int | None
+    The saved recipe's id, or None if the library couldn't be written to.
+  '''
+  library = get_library() if library is None else library
+  records = ingredient_records(recipe.ingredients)
+  try:
+    return library.save(recipe.title, recipe.url, recipe.base_yields, recipe.ingredients, records, RECORD_VERSION)
+  except sqlite3.Error:
+    return None
+
+def add_saved_recipe(shopping_list, recipe_id, coeff = 1, library = None):
+  '''
+  Add a saved recipe to the shopping list straight from its records, without scraping or parsing anything (unless its records are out of date).
+
+  Parameters:
+  ----------
+  shopping_list : ShoppingList
+    The list to add the recipe to.
+  recipe_id : int
+    The saved recipe's id.
+  coeff : int, optional
+    a coefficient by which to multiply the recipe's ingredients. Default is 1.
+  library : RecipeLibrary, optional
+    The library the recipe is saved in. Default is the user's library.
+
+  Returns:
+  -------
+  int
+    1 if there were issues adding some ingredients from the recipe (including lines that couldn't be parsed when it was saved), 0 if there were no issues
+
+  Raises:
+  ------
+  ValueError
+    If there's no saved recipe with that id.
+  '''
+  library = get_library() if library is None else library
+  saved = library.get(recipe_id)
+  if saved is None:
+    raise ValueError(f"No saved recipe with the id {recipe_id}.")
+  records = saved.records
+  if saved.version != RECORD_VERSION:
+    records = ingredient_records(saved.ingredients)
+    library.update_records(saved.id, records, RECORD_VERSION)
+  items = []
+  issues = False
+  for record in records:
+    if 'failed' in record:
+      cprint(record['failed'], 'red')
+      issues = True
+    else:
+      items.append(ShoppingIngredient.from_record(record))
+  recipe = Recipe(saved.title, saved.ingredients, saved.yields, saved.url, saved, coeff)
+  result = shopping_list.add_recipe(recipe, items)
+  if issues:
+    return 1
+  return result
+
+# Add ingredients from a recipe in the library
+# pick a saved recipe (type / to search), choose its yield, and add it
+def add_saved_recipe_from_library(shopping_list):
+  from simple_term_menu import TerminalMenu
+  saved = get_library().recipes()
+  if not saved:
+    cprint("There aren't any saved recipes yet. Recipes are saved when they're added by URL.", WARN)
+    return
+  # '|' separates a menu entry from its preview, so it's left out of titles
+  names = [f"{recipe.title} - {recipe.yields}".replace('|', '/') if recipe.yields else recipe.title.replace('|', '/') for recipe in saved]
+  recipe_menu = TerminalMenu([*names, "Back"])
+  index = recipe_menu.show()
+  if index is None or index == len(names):
+    return
+  recipe = saved[index]
+  coeff = choose_coeff(recipe.title, recipe.yields)
+  try:
+    result = add_saved_recipe(shopping_list, recipe.id, coeff)
+  except ValueError as e:
+    cprint(e, ERR)
+    return
   if result == 1:
     cprint(f"There were issues adding some ingredients from the recipe. The shopping list now has {shopping_list.length} items", WARN)
   else:
@@ -532,6 +1329,29 @@ def remove_items_from_list(shopping_list):
       cprint(e, ERR)
       break
 
+# rescale or remove a recipe that's on the list, which only redoes the items
+# that recipe added to
+def change_recipe(shopping_list):
+  from simple_term_menu import TerminalMenu
+  if not shopping_list.recipes:
+    cprint("There aren't any recipes on the list.", ERR)
+    return
+  titles = [recipe.title.replace('|', '/') for recipe in shopping_list.recipes]
+  index = TerminalMenu([*titles, "Back"]).show()
+  if index is None or index == len(titles):
+    return
+  recipe = shopping_list.recipes[index]
+  action = TerminalMenu(["Change its yield", "Remove it and its ingredients", "Back"]).show()
+  try:
+    if action == 0:
+      shopping_list.rescale_recipe(recipe.title, choose_coeff(recipe.title, recipe.base_yields or 'an unknown amount', recipe.coeff))
+      cprint(f"Rescaled {recipe.title}. The shopping list now has {shopping_list.length} items.", GOOD)
+    elif action == 1:
+      shopping_list.remove_recipe(recipe.title)
+      cprint(f"Removed {recipe.title}. The shopping list now has {shopping_list.length} items.", GOOD)
+  except Exception as e:
+    cprint(e, ERR)
+
 def view_list(shopping_list):
   if shopping_list.length == 0:
     print("The shopping list is empty!")
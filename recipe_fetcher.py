@@ -0,0 +1,501 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import json
+import os
+import sqlite3
+import threading
+import time
+
+############################################
+# Recipe Fetching
+############################################
+
+# fetching a recipe is almost all waiting on the network, so a batch of URLs is
+# fetched on a pool of threads. each URL gets its own deadline, and results come
+# back in the order the URLs were given, whatever order they finish in.
+
+FETCH_WORKERS = 8
+FETCH_TIMEOUT = 15
+FETCH_CHUNK_SIZE = 64 * 1024
+
+# the extracted recipe - all the app needs from the page
+ScrapedRecipe = namedtuple('ScrapedRecipe', ['url', 'title', 'ingredients', 'yields'])
+# what happened to each URL given to fetch_recipes, recipe is None if it failed
+FetchResult = namedtuple('FetchResult', ['url', 'recipe', 'error'])
+# a finished download. status is 304 and content is empty if the page hadn't changed
+Download = namedtuple('Download', ['status', 'content', 'url', 'etag', 'last_modified'])
+
+class RecipeFetchError(Exception):
+  pass
+
+############################################
+# Recipe Cache
+############################################
+
+# adding the same recipe again used to download the page and run it through
+# BeautifulSoup and extruct all over again. pages and what was scraped from them
+# are kept in an SQLite file keyed on the normalized URL. for a day after a page
+# is fetched it's served straight from the cache, and after that it's revalidated
+# with its ETag or Last-Modified, so an unchanged page is a 304 and no parsing.
+
+RECIPE_CACHE_TTL = 24 * 60 * 60
+
+DEFAULT_RECIPE_CACHE_PATH = os.environ.get(
+  'SHOPPING_LIST_RECIPE_CACHE',
+  os.path.join(os.path.expanduser('~'), '.cache', 'shopping-list', 'recipe_cache.sqlite3')
+)
+
+# only serve recipes that are already in the cache, however old, and never go to
+# the network
+OFFLINE = os.environ.get('SHOPPING_LIST_OFFLINE', '') not in ('', '0')
+
+# query parameters that only say where a link was clicked, not which page it is
+TRACKING_PARAMETERS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ref'}
+
+def normalize_url(url):
+  '''
+  Reduce a URL to the form recipes are cached under, so trivially different links to the same page share an entry.
+
+  The scheme and host are lowercased, default ports, fragments, trailing slashes and tracking parameters (utm_* and the like) are dropped, and the remaining query parameters are sorted.
+  '''
+  parts = urlsplit(url.strip())
+  scheme = parts.scheme.lower()
+  host = (parts.hostname or '').lower()
+  if parts.port and (scheme, parts.port) not in (('http', 80), ('https', 443)):
+    host = f'{host}:{parts.port}'
+  path = parts.path.rstrip('/') or '/'
+  query = sorted(
+    (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+    if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMETERS
+  )
+  return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+# what the cache holds for a page
+CachedRecipe = namedtuple('CachedRecipe', ['recipe', 'fetched', 'etag', 'last_modified'])
+
+class RecipeCache:
+  '''
+  A cache of downloaded recipe pages and the recipes scraped from them, in an SQLite file.
+
+  Parameters
+  ----------
+  path : str, optional
+    The SQLite file to keep recipes in. If None, the cache is memory only. Default is DEFAULT_RECIPE_CACHE_PATH.
+  ttl : float, optional
+    Seconds a page is served from the cache before it's revalidated. Default is RECIPE_CACHE_TTL.
+
+  The SQLite file isn't opened until the cache is first used.
+  '''
+  def __init__(self, path = DEFAULT_RECIPE_CACHE_PATH, ttl = RECIPE_CACHE_TTL):
+    self.ttl = ttl
+    self._lock = threading.Lock()
+    self._path = path
+    self._db = None
+    self._persistent = False
+
+  def _database(self):
+    # opened on first use, with self._lock held
+    if self._db is None:
+      if self._path:
+        try:
+          self._db = self._open(self._path)
+          self._persistent = True
+        # a cache that can't be written to shouldn't stop anyone importing a recipe,
+        # it just won't outlast the session
+        except (OSError, sqlite3.Error):
+          pass
+      if not self._persistent:
+        self._db = self._open(':memory:')
+    return self._db
+
+  def _open(self, path):
+    directory = os.path.dirname(path)
+    if directory:
+      os.makedirs(directory, exist_ok=True)
+    db = sqlite3.connect(path, check_same_thread=False)
+    db.execute('''CREATE TABLE IF NOT EXISTS recipes (
+      url TEXT PRIMARY KEY,
+      fetched REAL NOT NULL,
+      etag TEXT,
+      last_modified TEXT,
+      final_url TEXT NOT NULL,
+      html BLOB NOT NULL,
+      title TEXT,
+      ingredients TEXT NOT NULL,
+      yields TEXT
+    )''')
+    db.commit()
+    return db
+
+  @property
+  def persistent(self):
+    with self._lock:
+      self._database()
+    return self._persistent
+
+  def get(self, url):
+    '''
+    Return the CachedRecipe for url, or None if it isn't cached.
+    '''
+    with self._lock:
+      row = self._database().execute(
+        'SELECT fetched, etag, last_modified, final_url, title, ingredients, yields FROM recipes WHERE url = ?',
+        (normalize_url(url),)
+      ).fetchone()
+    if row is None:
+      return None
+    fetched, etag, last_modified, final_url, title, ingredients, yields = row
+    return CachedRecipe(ScrapedRecipe(final_url, title, json.loads(ingredients), yields), fetched, etag, last_modified)
+
+  def html(self, url):
+    '''
+    Return the raw page cached for url, or None if it isn't cached.
+    '''
+    with self._lock:
+      row = self._database().execute('SELECT html FROM recipes WHERE url = ?', (normalize_url(url),)).fetchone()
+    return row[0] if row else None
+
+  def is_fresh(self, entry):
+    return time.time() - entry.fetched < self.ttl
+
+  def put(self, url, download, recipe):
+    '''
+    Cache a downloaded page and the recipe scraped from it.
+    '''
+    self._write(
+      'INSERT OR REPLACE INTO recipes (url, fetched, etag, last_modified, final_url, html, title, ingredients, yields) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+      (normalize_url(url), time.time(), download.etag, download.last_modified, download.url, download.content,
+       recipe.title, json.dumps(list(recipe.ingredients)), recipe.yields)
+    )
+
+  def revalidated(self, url, download):
+    '''
+    Restart a cached page's TTL after the server said it hasn't changed, picking up any new validators.
+    '''
+    self._write(
+      'UPDATE recipes SET fetched = ?, etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?',
+      (time.time(), download.etag, download.last_modified, normalize_url(url))
+    )
+
+  def _write(self, statement, values):
+    try:
+      with self._lock:
+        db = self._database()
+        db.execute(statement, values)
+        db.commit()
+    except sqlite3.Error:
+      pass
+
+  def __len__(self):
+    with self._lock:
+      return self._database().execute('SELECT COUNT(*) FROM recipes').fetchone()[0]
+
+  def clear(self):
+    self._write('DELETE FROM recipes', ())
+
+RECIPE_CACHE = RecipeCache()
+
+############################################
+# Connection Pooling
+############################################
+
+# every page used to be fetched on a connection of its own, so a batch of
+# recipes from one site paid for a TCP and TLS handshake each. pages are fetched
+# through one shared session instead, which keeps a pool of open connections per
+# host. download retries connection failures and overloaded servers with a
+# backoff, as long as the page's deadline leaves time to.
+
+# how many hosts to keep connections open to
+POOL_CONNECTIONS = 16
+# how many connections to keep open to each host - as many as could be fetching
+# from it at once, or the extras are thrown away rather than reused
+POOL_MAXSIZE = FETCH_WORKERS
+FETCH_RETRIES = 2
+FETCH_BACKOFF = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# how much each host's connections have been reused - reused is requests made on
+# a connection that was already open
+ConnectionStats = namedtuple('ConnectionStats', ['requests', 'connections', 'reused'])
+
+_session = None
+_session_lock = threading.Lock()
+
+def make_session(pool_connections = POOL_CONNECTIONS, pool_maxsize = POOL_MAXSIZE, retries = FETCH_RETRIES, backoff = FETCH_BACKOFF):
+  '''
+  Make a requests session that pools connections per host and retries failed requests.
+
+  Parameters
+  ----------
+  pool_connections : int, optional
+    How many hosts to keep connections open to. Default is POOL_CONNECTIONS.
+  pool_maxsize : int, optional
+    How many connections to keep open to each host. Default is POOL_MAXSIZE.
+  retries : int, optional
+    How many times download retries a request that couldn't connect or got one of RETRY_STATUSES. Default is FETCH_RETRIES.
+  backoff : float, optional
+    The backoff factor between retries, in seconds - they wait backoff, then twice that, and so on. Default is FETCH_BACKOFF.
+
+  Returns
+  -------
+  requests.Session
+  '''
+  import requests
+  from recipe_scrapers._abstract import HEADERS
+  # urllib3's own retries would wait out a Retry-After or a backoff without
+  # knowing the page's deadline, so the adapter doesn't retry and download does
+  adapter = requests.adapters.HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+  session = requests.Session()
+  session.fetch_retries = retries
+  session.fetch_backoff = backoff
+  session.headers.update(HEADERS)
+  session.mount('http://', adapter)
+  session.mount('https://', adapter)
+  return session
+
+def get_session():
+  '''
+  Return the shared session, making it on first use.
+  '''
+  global _session
+  with _session_lock:
+    if _session is None:
+      _session = make_session()
+    return _session
+
+def configure_session(**options):
+  '''
+  Replace the shared session with one made with different options - see make_session. Connections open on the old one are closed.
+  '''
+  global _session
+  session = make_session(**options)
+  with _session_lock:
+    old, _session = _session, session
+  if old is not None:
+    old.close()
+
+def connection_stats():
+  '''
+  Return how much the shared session has reused its connections so far.
+
+  Returns
+  -------
+  dict
+    A ConnectionStats for each host the session still has a pool for, keyed on 'scheme://host:port'.
+  '''
+  stats = {}
+  with _session_lock:
+    session = _session
+  if session is None:
+    return stats
+  for adapter in dict.fromkeys(session.adapters.values()):
+    pools = adapter.poolmanager.pools
+    for key in pools.keys():
+      pool = pools.get(key)
+      if pool is None:
+        continue
+      host = f'{pool.scheme}://{pool.host}:{pool.port}'
+      stats[host] = ConnectionStats(pool.num_requests, pool.num_connections, max(0, pool.num_requests - pool.num_connections))
+  return stats
+
+# recipe_scrapers sets up each scraper class's plugins the first time one is made,
+# which isn't safe to do from two threads at once. parsing the page is pure python
+# and holds the GIL anyway, so pages are scraped one at a time, and only the
+# network waits happen in parallel
+_scrape_lock = threading.Lock()
+
+def read_urls(text):
+  '''
+  Pull the URLs out of some pasted text or the contents of a file - one or more per line, separated by whitespace. Blank lines and lines starting with # are skipped, and repeated URLs are only kept the first time.
+
+  Returns
+  -------
+  list of str
+  '''
+  urls = []
+  for line in text.splitlines():
+    line = line.strip()
+    if not line or line.startswith('#'):
+      continue
+    urls += line.split()
+  return list(dict.fromkeys(urls))
+
+def download(url, timeout = FETCH_TIMEOUT, headers = None):
+  '''
+  Download a page, giving up if the whole download takes longer than timeout seconds, retries and all.
+
+  A request that couldn't connect or got one of RETRY_STATUSES is retried after a backoff, or after the server's Retry-After if it gave one, unless that wait would go past the deadline - then the last failure is raised straight away.
+
+  Parameters
+  ----------
+  url : str
+    The page to download.
+  timeout : float, optional
+    Seconds the download gets. Default is FETCH_TIMEOUT.
+  headers : dict, optional
+    Extra request headers, ie If-None-Match to revalidate a cached page.
+
+  Returns
+  -------
+  Download
+  '''
+  import requests
+  from urllib3.exceptions import ReadTimeoutError
+  deadline = time.monotonic() + timeout
+  session = get_session()
+  retries = session.fetch_retries
+  for attempt in range(retries + 1):
+    left = deadline - time.monotonic()
+    if left <= 0:
+      raise RecipeFetchError(f"Timed out after {timeout}s.")
+    try:
+      with session.get(url, headers=headers, timeout=left, stream=True) as response:
+        if attempt == retries or response.status_code not in RETRY_STATUSES:
+          response.raise_for_status()
+          chunks = []
+          for chunk in response.iter_content(FETCH_CHUNK_SIZE):
+            chunks.append(chunk)
+            if time.monotonic() > deadline:
+              raise RecipeFetchError(f"Timed out after {timeout}s.")
+          return Download(
+            response.status_code, b''.join(chunks), response.url,
+            response.headers.get('ETag'), response.headers.get('Last-Modified')
+          )
+        failure = f'{response.status_code} {response.reason} for url: {response.url}'
+        wait = _retry_after(response)
+    except requests.Timeout:
+      raise RecipeFetchError(f"Timed out after {timeout}s.")
+    except requests.ConnectionError as e:
+      # a read that times out part way through the body comes back as a connection error
+      if e.args and isinstance(e.args[0], ReadTimeoutError):
+        raise RecipeFetchError(f"Timed out after {timeout}s.")
+      if attempt == retries:
+        raise RecipeFetchError(str(e) or type(e).__name__)
+      failure = str(e) or type(e).__name__
+      wait = None
+    except requests.RequestException as e:
+      raise RecipeFetchError(str(e) or type(e).__name__)
+    if wait is None:
+      wait = session.fetch_backoff * 2 ** attempt
+    # no use waiting if there'd be no time left to try again
+    if time.monotonic() + wait >= deadline:
+      raise RecipeFetchError(failure)
+    time.sleep(wait)
+
+def _retry_after(response):
+  # seconds the server asked to wait before trying again, if it did
+  value = response.headers.get('Retry-After')
+  if not value:
+    return None
+  try:
+    return max(0.0, float(value))
+  except ValueError:
+    pass
+  try:
+    return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+  except (TypeError, ValueError):
+    return None
+
+def fetch_html(url, timeout = FETCH_TIMEOUT):
+  '''
+  Download a page, giving up if the whole download takes longer than timeout seconds.
+
+  Returns
+  -------
+  tuple
+    (content, url) - the raw bytes of the page and the URL it ended up at after any redirects.
+  '''
+  page = download(url, timeout)
+  return page.content, page.url
+
+def scrape_recipe(content, url):
+  '''
+  Extract a recipe from a downloaded page, with the scraper for the site if recipe_scrapers has one, otherwise from the page's schema.org data.
+
+  Returns
+  -------
+  ScrapedRecipe
+  '''
+  from recipe_scrapers import scrape_html
+  try:
+    with _scrape_lock:
+      scraper = scrape_html(content, org_url=url)
+      return ScrapedRecipe(url, scraper.title(), scraper.ingredients(), scraper.yields())
+  except Exception as e:
+    raise RecipeFetchError(f"Couldn't find a recipe on the page ({type(e).__name__}).")
+
+def fetch_recipe(url, timeout = FETCH_TIMEOUT, cache = None, offline = None):
+  '''
+  Fetch and scrape one recipe, from the recipe cache if it's there and fresh or the page hasn't changed since.
+
+  Parameters
+  ----------
+  url : str
+    The recipe page.
+  timeout : float, optional
+    Seconds the page gets to download. Default is FETCH_TIMEOUT.
+  cache : RecipeCache, optional
+    The cache to use. Default is the module's RECIPE_CACHE.
+  offline : bool, optional
+    Only serve the recipe from the cache. Default is OFFLINE.
+
+  Raises
+  ------
+  RecipeFetchError
+    If the page couldn't be downloaded in time or has no recipe on it, or it isn't cached and we're offline.
+  '''
+  cache = RECIPE_CACHE if cache is None else cache
+  offline = OFFLINE if offline is None else offline
+  entry = cache.get(url)
+  if entry and (offline or cache.is_fresh(entry)):
+    return entry.recipe._replace(url=url)
+  if offline:
+    raise RecipeFetchError("Not in the recipe cache, and can't fetch it while offline.")
+
+  validators = {}
+  if entry and entry.etag:
+    validators['If-None-Match'] = entry.etag
+  if entry and entry.last_modified:
+    validators['If-Modified-Since'] = entry.last_modified
+  page = download(url, timeout, validators)
+  if page.status == 304 and entry:
+    cache.revalidated(url, page)
+    return entry.recipe._replace(url=url)
+  recipe = scrape_recipe(page.content, page.url)._replace(url=url)
+  cache.put(url, page, recipe)
+  return recipe
+
+def _fetch_result(url, timeout, cache, offline):
+  try:
+    return FetchResult(url, fetch_recipe(url, timeout, cache, offline), None)
+  except RecipeFetchError as e:
+    return FetchResult(url, None, str(e))
+
+def fetch_recipes(urls, max_workers = FETCH_WORKERS, timeout = FETCH_TIMEOUT, cache = None, offline = None):
+  '''
+  Fetch and scrape several recipes at once.
+
+  Parameters
+  ----------
+  urls : list of str
+    The recipe pages to fetch.
+  max_workers : int, optional
+    The most pages to fetch at the same time. Default is FETCH_WORKERS.
+  timeout : float, optional
+    Seconds each page gets to download. Default is FETCH_TIMEOUT.
+  cache : RecipeCache, optional
+    The cache to use. Default is the module's RECIPE_CACHE.
+  offline : bool, optional
+    Only serve recipes from the cache. Default is OFFLINE.
+
+  Returns
+  -------
+  list of FetchResult
+    One per URL, in the order given.
+  '''
+  if not urls:
+    return []
+  with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls)))) as pool:
+    return list(pool.map(lambda url: _fetch_result(url, timeout, cache, offline), urls))
@@ -0,0 +1,201 @@
+from collections import namedtuple
+from recipe_fetcher import normalize_url
+import json
+import os
+import sqlite3
+import threading
+import time
+
+############################################
+# Recipe Library
+############################################
+
+# recipes used to only last as long as the session, so using one again meant
+# scraping, parsing and categorizing it all over again. saved recipes are kept
+# in an SQLite file along with their ingredients already parsed and categorized,
+# as plain records that ShoppingIngredient.from_record turns straight back into
+# ingredients. records are stamped with a version (the record format, parser
+# version and categorizer vocabulary), so the app can tell when they're out of
+# date and rebuild them from the recipe's ingredient lines.
+#
+# this module only stores records - it doesn't know how they're made, see
+# save_recipe and add_saved_recipe in project.py.
+
+DEFAULT_LIBRARY_PATH = os.environ.get(
+  'SHOPPING_LIST_LIBRARY',
+  os.path.join(os.path.expanduser('~'), '.local', 'share', 'shopping-list', 'library.sqlite3')
+)
+
+# a recipe in the library. records is None in listings, which don't load them
+SavedRecipe = namedtuple('SavedRecipe', ['id', 'title', 'url', 'yields', 'ingredients', 'records', 'version', 'saved'])
+
+class RecipeLibrary:
+  '''
+  A store of saved recipes and their parsed ingredient records, in an SQLite file, looked up by id, URL or title.
+
+  Parameters
+  ----------
+  path : str, optional
+    The SQLite file to keep recipes in. If None, the library is memory only. Default is DEFAULT_LIBRARY_PATH.
+  '''
+  def __init__(self, path = DEFAULT_LIBRARY_PATH):
+    self._lock = threading.Lock()
+    self._persistent = False
+    if path:
+      try:
+        self._db = self._open(path)
+        self._persistent = True
+      # recipes just won't outlast the session
+      except (OSError, sqlite3.Error):
+        pass
+    if not self._persistent:
+      self._db = self._open(':memory:')
+
+  def _open(self, path):
+    directory = os.path.dirname(path)
+    if directory:
+      os.makedirs(directory, exist_ok=True)
+    db = sqlite3.connect(path, check_same_thread=False)
+    db.execute('''CREATE TABLE IF NOT EXISTS recipes (
+      id INTEGER PRIMARY KEY,
+      url TEXT UNIQUE,
+      title TEXT NOT NULL,
+      title_key TEXT NOT NULL,
+      yields TEXT,
+      ingredients TEXT NOT NULL,
+      records TEXT NOT NULL,
+      version TEXT NOT NULL,
+      saved REAL NOT NULL
+    )''')
+    db.execute('CREATE INDEX IF NOT EXISTS recipes_title ON recipes (title_key)')
+    db.commit()
+    return db
+
+  @property
+  def persistent(self):
+    return self._persistent
+
+  def save(self, title, url, yields, ingredients, records, version):
+    '''
+    Save a recipe, replacing the one saved from the same URL if there is one (it keeps its id).
+
+    Parameters
+    ----------
+    title : str
+      The recipe's title.
+    url : str | None
+      The page the recipe came from, if any.
+    yields : str | None
+      The recipe's yield, ie '4 servings'.
+    ingredients : list of str
+      The recipe's ingredient lines, as written.
+    records : list of dict
+      The parsed ingredients, see ShoppingIngredient.to_record.
+    version : str
+      What the records were made with, for telling when they're out of date.
+
+    Returns
+    -------
+    int
+      The recipe's id.
+    '''
+    values = (
+      normalize_url(url) if url else None, title, _title_key(title), yields,
+      json.dumps(list(ingredients)), json.dumps(records), version, time.time(),
+    )
+    with self._lock:
+      cursor = self._db.execute('''INSERT INTO recipes (url, title, title_key, yields, ingredients, records, version, saved)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (url) DO UPDATE SET title = excluded.title, title_key = excluded.title_key, yields = excluded.yields,
+          ingredients = excluded.ingredients, records = excluded.records, version = excluded.version, saved = excluded.saved''', values)
+      recipe_id = cursor.lastrowid
+      # lastrowid isn't the row's id when it was an update
+      if values[0] is not None:
+        recipe_id = self._db.execute('SELECT id FROM recipes WHERE url = ?', (values[0],)).fetchone()[0]
+      self._db.commit()
+    return recipe_id
+
+  def update_records(self, recipe_id, records, version):
+    '''
+    Replace a saved recipe's records, ie after rebuilding ones that were out of date.
+    '''
+    with self._lock:
+      self._db.execute('UPDATE recipes SET records = ?, version = ? WHERE id = ?', (json.dumps(records), version, recipe_id))
+      self._db.commit()
+
+  def get(self, recipe_id):
+    '''
+    Return the SavedRecipe with recipe_id, records and all, or None if there isn't one.
+    '''
+    return self._one('id = ?', (recipe_id,))
+
+  def find_by_url(self, url):
+    '''
+    Return the SavedRecipe saved from url, records and all, or None if there isn't one.
+    '''
+    return self._one('url = ?', (normalize_url(url),))
+
+  def find_by_title(self, title):
+    '''
+    Return the saved recipes with exactly this title, ignoring case and spacing, without their records.
+    '''
+    return self._listing('WHERE title_key = ?', (_title_key(title),))
+
+  def search(self, title):
+    '''
+    Return the saved recipes whose titles contain title, ignoring case, without their records.
+    '''
+    pattern = '%' + _title_key(title).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    return self._listing("WHERE title_key LIKE ? ESCAPE '\\'", (pattern,))
+
+  def recipes(self):
+    '''
+    Return every saved recipe, by title, without their records.
+    '''
+    return self._listing('', ())
+
+  def delete(self, recipe_id):
+    with self._lock:
+      deleted = self._db.execute('DELETE FROM recipes WHERE id = ?', (recipe_id,)).rowcount
+      self._db.commit()
+    return deleted > 0
+
+  def __len__(self):
+    with self._lock:
+      return self._db.execute('SELECT COUNT(*) FROM recipes').fetchone()[0]
+
+  def _one(self, where, values):
+    with self._lock:
+      row = self._db.execute(
+        f'SELECT id, title, url, yields, ingredients, records, version, saved FROM recipes WHERE {where}', values
+      ).fetchone()
+    if row is None:
+      return None
+    recipe_id, title, url, yields, ingredients, records, version, saved = row
+    return SavedRecipe(recipe_id, title, url, yields, json.loads(ingredients), json.loads(records), version, saved)
+
+  def _listing(self, where, values):
+    with self._lock:
+      rows = self._db.execute(
+        f'SELECT id, title, url, yields, ingredients, version, saved FROM recipes {where} ORDER BY title_key, id', values
+      ).fetchall()
+    return [
+      SavedRecipe(recipe_id, title, url, yields, json.loads(ingredients), None, version, saved)
+      for recipe_id, title, url, yields, ingredients, version, saved in rows
+    ]
+
+def _title_key(title):
+  return ' '.join(title.lower().split())
+
+_library = None
+_library_lock = threading.Lock()
+
+def get_library():
+  '''
+  Return the user's recipe library, opening it on first use.
+  '''
+  global _library
+  with _library_lock:
+    if _library is None:
+      _library = RecipeLibrary()
+    return _library
@@ -1,6 +1,51 @@
 import pytest
-from project import ShoppingIngredient, ShoppingList, convert_to_pint_unit, categorize_ingredient, add_ingredients, multiply_ingredient
+import hashlib
+import http.server
+import mmap
+import os
+import subprocess
+import sys
+import threading
+import time
+from project import ShoppingIngredient, ShoppingList, Recipe, APPENDED, MERGED, FAILED, convert_to_pint_unit, categorize_ingredient, add_ingredients, multiply_ingredient
 from pint import Unit
+from fractions import Fraction
+from ingredient_categorizer import CATEGORY_CACHE, CategoryIndex, TermMatcher, categorize_ingredient_broadly, fuzzy_lookup, load_category_index
+from utils import LRUCache, TrigramIndex, pluralize, pluralize_unit, singularize, unit_conversion
+import ingredient_categorizer
+import ingredient_parsing
+import project
+import recipe_fetcher
+import recipe_library
+import utils
+from project import add_saved_recipe, import_recipes, save_recipe
+from recipe_library import RecipeLibrary
+from recipe_fetcher import RecipeCache, RecipeFetchError, configure_session, connection_stats, fetch_recipe, fetch_recipes, normalize_url, read_urls
+from ingredient_parsing import ParseCache, fast_parse, fast_path_info, parse_ingredient_cached, reset_fast_path_info
+
+CACHE_VARIABLES = {
+    'SHOPPING_LIST_PARSE_CACHE': 'parse_cache.sqlite3',
+    'SHOPPING_LIST_RECIPE_CACHE': 'recipe_cache.sqlite3',
+    'SHOPPING_LIST_CATEGORY_INDEX': 'category_index.bin',
+    'SHOPPING_LIST_UNIT_TABLES': 'unit_tables.pickle',
+    'SHOPPING_LIST_LIBRARY': 'library.sqlite3',
+}
+
+@pytest.fixture(scope='session', autouse=True)
+def cache_directory(tmp_path_factory):
+    # keep the caches and library out of the user's ~/.cache and ~/.local, both
+    # here and in any interpreter the tests start
+    directory = tmp_path_factory.mktemp('cache')
+    paths = {variable: str(directory / name) for variable, name in CACHE_VARIABLES.items()}
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        for variable, path in paths.items():
+            monkeypatch.setenv(variable, path)
+        monkeypatch.setattr(ingredient_categorizer, 'DEFAULT_CATEGORY_INDEX_PATH', paths['SHOPPING_LIST_CATEGORY_INDEX'])
+        monkeypatch.setattr(utils, 'UNIT_TABLES_PATH', paths['SHOPPING_LIST_UNIT_TABLES'])
+        monkeypatch.setattr(ingredient_parsing, 'PARSE_CACHE', ParseCache(paths['SHOPPING_LIST_PARSE_CACHE']))
+        monkeypatch.setattr(recipe_fetcher, 'RECIPE_CACHE', RecipeCache(paths['SHOPPING_LIST_RECIPE_CACHE']))
+        monkeypatch.setattr(recipe_library, '_library', RecipeLibrary(paths['SHOPPING_LIST_LIBRARY']))
+        yield directory
 
 def test_add_ingredients():
     # add together two quantities of same unit
@@ -58,3 +103,833 @@ def test_categorize_ingredient():
     # this is wrong but I'm not sure about easy way to fix it
     assert categorize_ingredient("chicken or beef broth") == 'meat'
 
+
+def test_category_index():
+    # terms listed in more than one category go to the first listed category
+    index = ingredient_categorizer.get_category_index()
+    assert index['quail'] == 'meat'
+    assert index['sage'] == 'produce'
+    assert categorize_ingredient("quail") == 'meat'
+
+    # vocabulary is normalized the same way as ingredient names
+    assert categorize_ingredient("basil, dried") == 'pantry'
+    assert categorize_ingredient("2% milk") == 'dairy_and_eggs'
+
+    # singularized lookups still work
+    assert categorize_ingredient("Cherry Tomatoes") == 'produce'
+
+def test_compiled_category_index(tmp_path):
+    path = tmp_path / 'index.bin'
+    index = load_category_index(str(path))
+    assert path.exists()
+    assert dict(index) == dict(ingredient_categorizer.get_category_index())
+    assert index['quail'] == 'meat'
+    assert index.get('not a food') is None
+    assert 'quail' in index and 'not a food' not in index
+
+    # a file from another vocabulary is recompiled
+    path.write_bytes(b'SLCI' + bytes(200))
+    assert load_category_index(str(path))['sage'] == 'produce'
+    assert CategoryIndex.open(str(path)).digest == index.digest
+
+    # somewhere it can't be written, it's compiled in memory
+    index = load_category_index(str(tmp_path / 'index.bin' / 'index.bin'))
+    assert not isinstance(index._data, mmap.mmap)
+    assert index['quail'] == 'meat'
+
+def test_categorize_ingredient_broadly():
+    # exact matches are unchanged
+    assert categorize_ingredient_broadly("chicken or beef broth") == 'meat'
+    # the longest term found in the name wins
+    assert categorize_ingredient_broadly("grated parmesan or pecorino romano") == 'dairy_and_eggs'
+    assert categorize_ingredient_broadly("crushed red-pepper flakes") == 'pantry'
+    assert categorize_ingredient_broadly("low-sodium chicken broth") == 'pantry'
+    assert categorize_ingredient_broadly("something unheard of") == 'misc'
+
+    # terms only match on word boundaries
+    matcher = TermMatcher(['pea', 'peanut', 'pepper'])
+    assert matcher.find_all('peanut') == [(0, 6, 'peanut')]
+    assert matcher.find_all('red-pepper') == [(4, 10, 'pepper')]
+
+def test_category_cache():
+    CATEGORY_CACHE.clear()
+    assert categorize_ingredient("Kosher Salt") == 'you_probably_already_have'
+    assert categorize_ingredient("Kosher Salt") == 'you_probably_already_have'
+    info = CATEGORY_CACHE.info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+    cache = LRUCache(maxsize=2)
+    cache.put('garlic', 'produce')
+    cache.put('flour', 'baking')
+    cache.get('garlic')
+    cache.put('salt', 'you_probably_already_have')
+    # flour was the least recently used
+    assert 'flour' not in cache
+    assert cache.info().evictions == 1
+
+def test_parse_cache(tmp_path, monkeypatch):
+    calls = []
+    parse = ingredient_parsing.parse_ingredient
+    monkeypatch.setattr(ingredient_parsing, 'parse_ingredient', lambda text: calls.append(text) or parse(text))
+    path = str(tmp_path / 'parse_cache.sqlite3')
+
+    cache = ParseCache(path, version='1.0')
+    first = parse_ingredient_cached("2 cups flour, sifted", cache)
+    second = parse_ingredient_cached("2 cups flour, sifted", cache)
+    assert calls == ["2 cups flour, sifted"]
+    # hits are shared rather than copied
+    assert first is second
+
+    # a new session reads from disk, without running the model
+    assert parse_ingredient_cached("2 cups flour, sifted", ParseCache(path, version='1.0')) == first
+    assert len(calls) == 1
+
+    # a different parser version doesn't see the old entries
+    parse_ingredient_cached("2 cups flour, sifted", ParseCache(path, version='2.0'))
+    assert len(calls) == 2
+
+def test_add_recipe_batch_parse(monkeypatch, capsys):
+    monkeypatch.setattr(ingredient_parsing, 'PARSE_CACHE', ParseCache(None))
+    lines = ["2 cups flour", "3 eggs", "2 cups", "1 cup flour", "1 orange", "1 orange", "1 tsp salt", ""]
+    recipe = Recipe("Test Recipe", lines, "4 servings", "https://example.com", coeff=2)
+
+    batch = ShoppingList()
+    assert batch.add_recipe(recipe) == 1
+    assert "Couldn't parse that item - 2 cups." in capsys.readouterr().out
+
+    one_by_one = ShoppingList()
+    for line in lines:
+        try:
+            one_by_one.add_item(line, 2)
+        except Exception:
+            pass
+    # same items, merged the same way, in the same order
+    assert str(batch) == str(one_by_one)
+    assert batch.items[0].amount.text == '6 cups'
+
+def test_parse_pool(monkeypatch):
+    import multiprocessing
+    from concurrent.futures.process import BrokenProcessPool
+    if multiprocessing.get_start_method() != 'fork':
+        pytest.skip("the workers need to inherit the patched parser")
+    parse = ingredient_parsing.parse_ingredient
+    def parse_or_fail(text):
+        if text == "1 cup of nothing":
+            raise ValueError("nothing to parse")
+        return parse(text)
+    monkeypatch.setattr(ingredient_parsing, 'parse_ingredient', parse_or_fail)
+    lines = ["1 cup broth", "2 large eggs", "1 cup of nothing", "2 Cups flour", "2 cups flour", "1 cup broth", "2-3 cloves garlic"]
+
+    def parse_all():
+        results = ingredient_parsing.parse_ingredients(lines, ParseCache(None))
+        return [repr(result) if isinstance(result, Exception) else result for result in results]
+
+    monkeypatch.setattr(ingredient_parsing, 'PARSE_WORKERS', 1)
+    serial = parse_all()
+    assert serial[2] == repr(Exception("nothing to parse"))
+    assert serial[0] == serial[5]
+
+    # enough lines for the pool, on a pool started with the patched parser
+    ingredient_parsing.shutdown_parse_pool()
+    monkeypatch.setattr(ingredient_parsing, 'PARSE_WORKERS', 2)
+    monkeypatch.setattr(ingredient_parsing, 'MIN_POOL_BATCH', 2)
+    try:
+        assert parse_all() == serial
+        assert ingredient_parsing._parse_pool is not None
+    finally:
+        ingredient_parsing.shutdown_parse_pool()
+
+    # a pool that breaks is dropped, and the lines are parsed here instead
+    class BrokenPool:
+        def map(self, *args):
+            raise BrokenProcessPool("a worker died")
+    monkeypatch.setattr(ingredient_parsing, '_parse_pool', BrokenPool())
+    monkeypatch.setattr(ingredient_parsing, 'shutdown_parse_pool', lambda: setattr(ingredient_parsing, '_parse_pool', None))
+    assert parse_all() == serial
+    assert ingredient_parsing._parse_pool is None
+
+FAST_PATH_CORPUS = [
+    "2 cups flour", "3 eggs", "1 1/2 cups sugar", "1/2 teaspoon salt", "1 orange",
+    "2 tablespoons olive oil", "1 pound ground beef", "4 chicken thighs", "0.5 cup milk",
+    "2 cloves garlic", "3 tbsp butter", "1/3 cup honey", "2 cans black beans",
+    "8 ounces cream cheese", "1 pinch salt", "2 1/2 pounds chicken wings", "1 red onion",
+    # these need the model
+    "1 cup broth", "2 large eggs", "1 cup of flour", "3 cloves", "2 Cups flour",
+    "1 bunch of cilantro, chopped finely", "2-3 cloves garlic",
+]
+
+def test_fast_path_matches_model():
+    def fields(parsed):
+        amounts = [(a.quantity, a.unit, a.text) for a in parsed.amount]
+        return parsed.name.text, amounts, parsed.preparation, parsed.comment
+
+    fast = 0
+    for line in FAST_PATH_CORPUS:
+        parsed = fast_parse(line)
+        if parsed:
+            fast += 1
+            assert fields(parsed) == fields(ingredient_parsing.parse_ingredient(line)), line
+    assert fast == 17
+
+    reset_fast_path_info()
+    for line in FAST_PATH_CORPUS:
+        parse_ingredient_cached(line)
+    assert fast_path_info()['fast'] == 17
+    assert fast_path_info()['model'] == len(FAST_PATH_CORPUS) - 17
+
+def test_shopping_list_index():
+    shopping_list = ShoppingList(["2 cups flour", "1 orange", "3 oranges"])
+    assert shopping_list.add_item("1 cup flour") == 1
+    assert shopping_list.items[0].amount.text == '3 cups'
+    # merges by canonical name
+    assert shopping_list.add_item("2 oranges") == 1
+    assert shopping_list.items[1].name == 'oranges'
+    assert shopping_list.add_item("3 eggs") == 0
+    assert shopping_list.length == 4
+
+    # removing an item hands its name over to the next item with that name
+    shopping_list.remove_item(1)
+    assert shopping_list.add_item("1 orange") == 1
+    assert shopping_list.items[1].quantity == '4'
+    shopping_list.remove_item(1)
+    assert shopping_list.add_item("1 orange") == 0
+
+def test_add_items():
+    shopping_list = ShoppingList(["1 cup flour"])
+    results = shopping_list.add_items(["2 cups flour", "3 eggs", "", "2 cups", "1 egg", "200 g flour"], coeff=2)
+    assert [r.status for r in results] == [MERGED, APPENDED, FAILED, FAILED, MERGED, FAILED]
+    assert results[0].item is shopping_list.items[0]
+    assert results[2].reason == "No item to add."
+    assert results[3].reason == "Couldn't parse that item - 2 cups."
+    assert "incompatible units" in results[5].reason
+    assert str(shopping_list) == "flour, 5 cups\neggs, 8"
+
+    # lines can come from any iterable, including a generator
+    results = shopping_list.add_items(f"{n} cups milk" for n in range(1, 4))
+    assert [r.status for r in results] == [APPENDED, MERGED, MERGED]
+    assert shopping_list.items[-1].amount.text == '6 cups'
+
+    # units without a conversion only add to the same unit, however it's written
+    shopping_list = ShoppingList()
+    lines = ["1 clove garlic", "1 head garlic", "2 cloves garlic", "1 slice bread", "2 slices bread"]
+    results = shopping_list.add_items(lines)
+    assert [r.status for r in results] == [APPENDED, FAILED, MERGED, APPENDED, MERGED]
+    assert "different units" in results[1].reason
+    assert str(shopping_list) == "garlic, 3 cloves\nbread, 3 slices"
+    # and merging them all at once keeps the head apart rather than losing it
+    pytest.importorskip('numpy')
+    import aggregation
+    merged = aggregation.aggregate_ingredients([ShoppingIngredient(line) for line in lines])
+    assert [str(item) for item in merged] == ["garlic, 3 cloves", "garlic, 1 head", "bread, 3 slices"]
+
+def test_categorized_view_is_incremental(monkeypatch):
+    shopping_list = ShoppingList()
+    shopping_list.add_items(["2 cups flour", "3 eggs", "1 orange", "1 tsp salt", "2 cloves garlic"])
+    assert shopping_list.string_categorized_items() == (
+        "YOU PROBABLY ALREADY HAVE:\nsalt, 1 tsp\n\n"
+        "PRODUCE:\norange, 1\ngarlic, 2 cloves\n\n"
+        "BAKING:\nflour, 2 cups\n\n"
+        "DAIRY AND EGGS:\neggs, 3\n"
+    )
+
+    rendered = []
+    render = ShoppingIngredient._render
+    monkeypatch.setattr(ShoppingIngredient, '_render', lambda self: rendered.append(self.name) or render(self))
+    shopping_list.string_categorized_items()
+    assert rendered == []
+
+    # only the changed item is rendered again
+    shopping_list.add_item("1 orange")
+    view = shopping_list.string_categorized_items()
+    assert rendered == ['oranges']
+    assert "PRODUCE:\noranges, 2\ngarlic, 2 cloves\n" in view
+
+    shopping_list.remove_item(0)
+    assert "BAKING" not in shopping_list.string_categorized_items()
+    assert list(shopping_list.categorized_items()) == ['you_probably_already_have', 'produce', 'dairy_and_eggs']
+
+    # items changed in place are shown as they are now, whether or not they've
+    # been rendered again since
+    shopping_list.items[-1] *= 2
+    assert "PRODUCE:\noranges, 2\ngarlic, 4 cloves\n" in shopping_list.string_categorized_items()
+    shopping_list.items[-1] *= 2
+    assert str(shopping_list).endswith("garlic, 8 cloves")
+    assert "garlic, 8 cloves" in shopping_list.string_categorized_items()
+
+def test_render_cache(monkeypatch):
+    x = ShoppingIngredient("1 bunch of cilantro, chopped finely")
+    assert str(x) == 'cilantro, 1 bunch (chopped finely)'
+
+    rendered = []
+    render = ShoppingIngredient._render
+    monkeypatch.setattr(ShoppingIngredient, '_render', lambda self: rendered.append(1) or render(self))
+    assert str(x) == 'cilantro, 1 bunch (chopped finely)'
+    assert rendered == []
+
+    # changing the quantity drops the cached text
+    x.quantity = 2
+    assert str(x) == 'cilantro, 2 bunches (chopped finely)'
+    assert str(x) == 'cilantro, 2 bunches (chopped finely)'
+    assert rendered == [1]
+
+def test_unit_conversion_table():
+    cup, tbsp, gram = Unit('cup'), Unit('tablespoon'), Unit('gram')
+    assert unit_conversion(cup).dimension == unit_conversion(tbsp).dimension
+    assert unit_conversion(cup).dimension != unit_conversion(gram).dimension
+    # same answer as pint
+    ratio = unit_conversion(cup).factor / unit_conversion(tbsp).factor
+    assert ratio == pytest.approx((1 * cup).to(tbsp).magnitude)
+
+    x = ShoppingIngredient("1 cup sugar")
+    y = ShoppingIngredient("8 tablespoons sugar")
+    assert add_ingredients(x, y).amount.text == '1.5 cups'
+
+    x = ShoppingIngredient("500 g flour")
+    y = ShoppingIngredient("1 kg flour")
+    assert add_ingredients(x, y).amount.text == '1.5 kilograms'
+
+def test_exact_quantities():
+    # rounding only happens when the quantity is shown, so small additions add up
+    x = ShoppingIngredient("100 g salt")
+    for _ in range(5):
+        x = add_ingredients(x, ShoppingIngredient("1.4 g salt"))
+    assert x.quantity_value == Fraction(107)
+    assert x.amount.text == '107 grams'
+
+    x = ShoppingIngredient("1 cup flour")
+    x = multiply_ingredient(x, 1.1)
+    assert x.quantity_value == Fraction(11, 10)
+    x = multiply_ingredient(x, 3)
+    assert x.quantity == '3.3'
+
+    # ranges aren't a single quantity
+    x = ShoppingIngredient("2-3 cloves garlic")
+    assert x.quantity_value is None
+    with pytest.raises(ValueError):
+        multiply_ingredient(x, 2)
+
+def test_compact_ingredient(monkeypatch):
+    x = ShoppingIngredient("2 cups flour")
+    assert not hasattr(x, '__dict__')
+    # the parser's output is only kept when debugging
+    assert x.parsed is None
+    assert x.amount.text == '2 cups'
+    assert x.amount.unit == Unit('cup')
+    monkeypatch.setattr(project, 'DEBUG_MODE', True)
+    assert ShoppingIngredient("2 cups flour").parsed.name.text == 'flour'
+
+def test_value_semantics():
+    x = ShoppingIngredient("1 cup sugar")
+    y = ShoppingIngredient("8 tablespoons sugar")
+    z = x + y
+    assert z.amount.text == '1.5 cups'
+    # neither operand changes
+    assert x.amount.text == '1 cup'
+    assert y.amount.text == '8 tablespoons'
+    doubled = x * 2
+    assert doubled.amount.text == '2 cups'
+    assert x.amount.text == '1 cup'
+    assert doubled.sentence is x.sentence
+
+    # the in place forms update the ingredient itself
+    x += y
+    assert x.amount.text == '1.5 cups'
+    x *= 2
+    assert x.amount.text == '3 cups'
+
+    # the list merges into the item it already holds
+    shopping_list = ShoppingList()
+    shopping_list.add_item("1 cup milk")
+    item = shopping_list.items[0]
+    shopping_list.add_item("2 cups milk")
+    assert shopping_list.items[0] is item
+    assert item.amount.text == '3 cups'
+
+def test_aggregate_matches_pairwise():
+    aggregation = pytest.importorskip('aggregation')
+    lines = [
+        "1 cup sugar", "2 tablespoons butter", "8 tablespoons sugar", "3 eggs",
+        "1 tablespoon butter", "1/2 cup sugar", "2 eggs", "2-3 cloves garlic",
+        "100 g flour", "1 kg flour", "3 teaspoons salt", "1 tablespoon salt",
+        "1 cup milk", "3 cups milk", "1 g yeast", "500 g yeast",
+    ]
+    items = [ShoppingIngredient(line) for line in lines]
+    # units that aren't in the conversion table
+    items[13].unit = Unit('deciliter')
+    items[15].unit = Unit('milligram')
+    pairwise = {}
+    for item in items:
+        if item.key in pairwise and item.quantity_value is not None:
+            pairwise[item.key] = pairwise[item.key] + item
+        else:
+            pairwise.setdefault(item.key, item)
+    merged = aggregation.aggregate_ingredients(items)
+    assert [str(item) for item in merged] == [str(item) for item in pairwise.values()]
+    assert unit_conversion(items[13].unit) is None
+    assert len(pairwise) == len(merged) == 8
+    # the inputs are left alone
+    assert [item.sentence for item in items] == lines
+    assert items[0].amount.text == '1 cup'
+    assert items[13].amount.text == '3 deciliters'
+
+    # same name, units that can't be added - kept apart
+    merged = aggregation.aggregate_ingredients([ShoppingIngredient("1 cup flour"), ShoppingIngredient("1 lb flour")])
+    assert len(merged) == 2
+
+    # nothing to merge
+    assert aggregation.aggregate_ingredients([]) == []
+    salt = [ShoppingIngredient("salt"), ShoppingIngredient("salt to taste")]
+    assert aggregation.aggregate_ingredients(salt) == salt
+    assert ShoppingList.combine([ShoppingList(), ShoppingList()]).length == 0
+    assert ShoppingList.combine([ShoppingList(["salt"]), ShoppingList(["pepper"])]).length == 2
+
+def test_combine_lists():
+    pytest.importorskip('numpy')
+    first = ShoppingList(["1 cup milk", "2 eggs"])
+    second = ShoppingList(["1 pint milk", "1 onion"])
+    combined = ShoppingList.combine([first, second])
+    assert [str(item) for item in combined.items] == ['milk, 1.5 pints', 'eggs, 2', 'onion, 1']
+    assert first.items[0].amount.text == '1 cup'
+    combined.add_item("1 cup milk")
+    assert combined.items[0].amount.text == '2 pints'
+    assert first.items[0].amount.text == '1 cup'
+
+    # the combined list's recipes can be removed or rescaled, and what was added
+    # by hand stays
+    def lists():
+        with_recipe = ShoppingList()
+        with_recipe.add_recipe(Recipe('Pudding', ['1 cup milk', '2 eggs'], '4 servings', None))
+        return ShoppingList(['3 cups milk']), with_recipe
+    by_hand, with_recipe = lists()
+    combined = ShoppingList.combine([by_hand, with_recipe])
+    assert [str(item) for item in combined.items] == ['milk, 4 cups', 'eggs, 2']
+    combined.rescale_recipe('Pudding', 2)
+    assert [str(item) for item in combined.items] == ['milk, 5 cups', 'eggs, 4']
+    assert combined.recipes[0].coeff == 2 and with_recipe.recipes[0].coeff == 1
+    assert [str(item) for item in with_recipe.items] == ['milk, 1 cup', 'eggs, 2']
+    combined.remove_recipe('Pudding')
+    assert str(combined) == 'milk, 3 cups'
+    assert combined.recipes == []
+
+def test_unit_and_noun_tables():
+    pint_units, _ = utils.get_unit_tables()
+    assert ('cups', False) in pint_units
+    assert convert_to_pint_unit("cups") == Unit('cup')
+    assert convert_to_pint_unit("fl oz") == Unit('fluid_ounce')
+    assert convert_to_pint_unit("cup", True) == Unit('imperial_cup')
+    assert convert_to_pint_unit("pinch") == 'pinch'
+    # units outside the table still convert
+    assert convert_to_pint_unit("millimeter") == Unit('millimeter')
+    assert convert_to_pint_unit("handfuls") == 'handfuls'
+    # every unit the table converts to has a conversion
+    assert all(unit_conversion(unit) for unit in pint_units.values() if isinstance(unit, Unit))
+    assert unit_conversion(convert_to_pint_unit("fl oz")).dimension == unit_conversion(Unit('cup')).dimension
+    assert str(add_ingredients(ShoppingIngredient("1 cup milk"), ShoppingIngredient("8 fl oz milk"))) == 'milk, 2 cups'
+    assert pluralize_unit("cup") == 'cups'
+    assert pluralize_unit("g") == 'g'
+    assert pluralize("tomato", 2) == 'tomatoes'
+    assert pluralize("tomato", 0.5) == 'tomatoes'
+    assert pluralize("tomato", 1) == 'tomato'
+    assert pluralize("tomatoes", 2) == 'tomatoes'
+    assert singularize("tomatoes") == 'tomato'
+
+def test_unit_tables_cache(tmp_path, monkeypatch):
+    path = str(tmp_path / 'unit_tables.pickle')
+    key = utils._unit_tables_key()
+    utils._write_unit_tables(path, utils._build_unit_tables(key))
+    assert utils._read_unit_tables(path, key) is not None
+    # tables built by older code aren't used
+    monkeypatch.setattr(utils, 'UNIT_TABLES_FORMAT', utils.UNIT_TABLES_FORMAT + 1)
+    assert utils._unit_tables_key() != key
+    assert utils._read_unit_tables(path, utils._unit_tables_key()) is None
+
+def test_lazy_imports():
+    # a fresh interpreter, since this one has loaded everything already
+    code = "import sys, project; print(sorted(m for m in ('recipe_scrapers', 'ingredient_parser', 'pint', 'inflect', 'simple_term_menu') if m in sys.modules))"
+    # without PYTHONPATH, so nothing on it can import them first
+    env = {key: value for key, value in os.environ.items() if key != 'PYTHONPATH'}
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+    assert result.stdout.strip() == '[]'
+
+    # and a line the fast path can parse doesn't need the model either
+    code = "import sys, project; project.ShoppingIngredient('2 cups flour'); print('ingredient_parser' in sys.modules)"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+    assert result.stdout.strip() == 'False'
+
+def test_import_opens_no_caches(tmp_path):
+    # caches are opened the first time they're used, not when they're imported
+    env = {key: value for key, value in os.environ.items() if key != 'PYTHONPATH'}
+    for variable, name in CACHE_VARIABLES.items():
+        env[variable] = str(tmp_path / 'cache' / name)
+    code = "import project, recipe_fetcher, ingredient_parsing, ingredient_categorizer, utils"
+    subprocess.run([sys.executable, '-c', code], check=True, cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+    assert not (tmp_path / 'cache').exists()
+
+    # and are then opened where they were pointed
+    code = "import recipe_fetcher; print(recipe_fetcher.RECIPE_CACHE.persistent)"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+    assert result.stdout.strip() == 'True'
+    assert sorted(path.name for path in (tmp_path / 'cache').iterdir()) == ['recipe_cache.sqlite3']
+
+def test_warm_up():
+    thread = project.start_warm_up()
+    # starting it again doesn't start another
+    assert project.start_warm_up() is thread
+    # getting ahead of it is fine
+    assert ShoppingIngredient("2 cups flour").amount.text == '2 cups'
+    thread.join(timeout=60)
+    assert project.warm_up_ready()
+
+def test_fuzzy_matching():
+    # misspellings are categorized by what they're most likely meant to be, by
+    # the broad lookup only
+    assert categorize_ingredient_broadly("jalepeno") == 'produce'
+    assert categorize_ingredient("jalepeno") == 'misc'
+    assert categorize_ingredient_broadly("parmesean") == 'dairy_and_eggs'
+    assert categorize_ingredient_broadly("something unheard of") == 'misc'
+    # but other words a letter off from one aren't taken for it
+    for name in ["wine", "beer", "port", "forks", "pate", "sherry"]:
+        assert categorize_ingredient_broadly(name) == 'misc', name
+    assert categorize_ingredient_broadly("pear") == categorize_ingredient_broadly("pears") == 'produce'
+    index = TrigramIndex(["jalapeno", "jackfruit"])
+    assert index.search("jalepeno")[0][0] == 'jalapeno'
+    assert index.search("xyz") == []
+    # an empty index is still the index to look in
+    assert fuzzy_lookup("jalepeno", TrigramIndex()) == []
+    assert fuzzy_lookup("jalepeno", index)[0][0] == 'jalapeno'
+
+    # names the categorizer doesn't know are merged into the item they're most
+    # likely meant to be
+    shopping_list = ShoppingList()
+    shopping_list.add_item("2 tablespoons gochujang")
+    results = shopping_list.add_items(["1 tablespoon gochujnag"])
+    assert results[0].status == MERGED
+    assert shopping_list.length == 1
+    assert shopping_list.items[0].quantity == '3'
+    # but a name in the vocabulary, in any form, is never taken for a typo, and
+    # nothing is taken for a typo of one
+    for first, second in [
+        ("1 cup peas", "1 pear"),
+        ("3 cups frozen pears", "2 cups frozen peas"),
+        ("2 cups frozen peas", "3 cups frozen pears"),
+        ("1 lb frozen pears", "2 cups frozen peas"),
+        ("1 cup oat milk", "1 cup goat milk"),
+        ("1 tablespoon dried dill", "1 cup dried dal"),
+        ("2 jalapenos", "1 jalepeno"),
+    ]:
+        shopping_list = ShoppingList([first])
+        results = shopping_list.add_items([second])
+        assert results[0].status == APPENDED, (first, second)
+        assert shopping_list.length == 2
+    # and a guess that doesn't add up is its own item rather than a failure
+    shopping_list = ShoppingList(["2 tablespoons gochujang"])
+    assert shopping_list.add_items(["1 gochujnag"])[0].status == APPENDED
+    assert shopping_list.length == 2
+
+RECIPE_PAGE = '''<html><head><title>{title}</title>
+<script type="application/ld+json">
+{{"@context": "https://schema.org", "@type": "Recipe", "name": "{title}", "recipeYield": "4 servings",
+ "recipeIngredient": {ingredients}}}
+</script></head><body><h1>{title}</h1></body></html>'''
+
+class RecipeSiteHandler(http.server.BaseHTTPRequestHandler):
+    pages = {
+        '/pancakes': RECIPE_PAGE.format(title='Pancakes', ingredients='["2 cups flour", "2 eggs", "1 cup milk"]'),
+        '/omelette': RECIPE_PAGE.format(title='Omelette', ingredients='["3 eggs", "1 tablespoon butter"]'),
+        '/about': '<html><body>Nothing to cook here.</body></html>',
+    }
+    # keep connections open between requests, like a real site
+    protocol_version = 'HTTP/1.1'
+    # (path, status) of every request served
+    served = []
+
+    def send_response(self, code, message=None):
+        self.served.append((self.path, code))
+        super().send_response(code, message)
+
+    def do_GET(self):
+        if self.path == '/slow':
+            self.send_response(200)
+            self.end_headers()
+            time.sleep(2)
+            return
+        path = self.path.split('?')[0]
+        # always too busy, and asks for longer than a short timeout allows
+        if path == '/busy':
+            self.send_response(429)
+            self.send_header('Retry-After', '4')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        # busy the first time, then the pancakes page
+        if path == '/flaky':
+            if ('/flaky', 503) not in self.served:
+                self.send_error(503)
+                return
+            path = '/pancakes'
+        page = self.pages.get(path)
+        if page is None:
+            self.send_error(404)
+            return
+        body = page.encode()
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def recipe_site():
+    RecipeSiteHandler.served = []
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), RecipeSiteHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+def test_fetch_recipes(recipe_site):
+    urls = [f'{recipe_site}/omelette', f'{recipe_site}/missing', f'{recipe_site}/pancakes', f'{recipe_site}/about', f'{recipe_site}/slow']
+    cache = RecipeCache(None)
+    results = fetch_recipes(urls, max_workers=4, timeout=0.5, cache=cache)
+    # in the order given, whatever order they finished in
+    assert [result.url for result in results] == urls
+    assert results[0].recipe.title == 'Omelette'
+    assert results[2].recipe.ingredients == ['2 cups flour', '2 eggs', '1 cup milk']
+    assert [bool(result.error) for result in results] == [False, True, False, True, True]
+    assert 'Timed out' in results[4].error
+
+    assert read_urls(f"{urls[0]}\n\n# lunch\n{urls[2]} {urls[0]}\n") == [urls[0], urls[2]]
+
+    shopping_list = ShoppingList()
+    import_recipes(shopping_list, [urls[2], urls[0]], library=RecipeLibrary(None), cache=cache)
+    assert [recipe.title for recipe in shopping_list.recipes] == ['Pancakes', 'Omelette']
+    assert shopping_list.length == 4
+
+def test_recipe_cache(recipe_site, tmp_path):
+    url = f'{recipe_site}/pancakes'
+    cache = RecipeCache(str(tmp_path / 'recipes.sqlite3'))
+    assert cache.persistent
+    recipe = fetch_recipe(url, cache=cache)
+    assert RecipeSiteHandler.served == [('/pancakes', 200)]
+    assert b'Pancakes' in cache.html(url)
+    # fresh, so neither the network nor the scraper is touched, and the same page
+    # under a slightly different URL shares the entry
+    assert normalize_url(f'{url}/?utm_source=mail#top') == normalize_url(url)
+    assert fetch_recipe(f'{url}/?utm_source=mail', cache=cache) == recipe._replace(url=f'{url}/?utm_source=mail')
+    assert len(RecipeSiteHandler.served) == 1
+
+    # stale, so it's revalidated, and the page hasn't changed
+    cache = RecipeCache(str(tmp_path / 'recipes.sqlite3'), ttl=0)
+    assert fetch_recipe(url, cache=cache) == recipe
+    assert RecipeSiteHandler.served[-1] == ('/pancakes', 304)
+
+    # offline, stale entries are still served and anything else is an error
+    assert fetch_recipe(url, cache=cache, offline=True) == recipe
+    with pytest.raises(RecipeFetchError):
+        fetch_recipe(f'{recipe_site}/omelette', cache=cache, offline=True)
+    assert len(RecipeSiteHandler.served) == 2
+
+def test_connection_reuse(recipe_site):
+    configure_session(backoff=0)
+    try:
+        urls = [f'{recipe_site}/{page}?batch={i}' for i in range(6) for page in ('pancakes', 'omelette')]
+        results = fetch_recipes(urls, max_workers=2, cache=RecipeCache(None))
+        assert all(result.recipe for result in results)
+        # two workers never need more than two connections to the same site
+        stats = connection_stats()[recipe_site]
+        assert stats.requests == 12
+        assert stats.connections <= 2
+        assert stats.reused == stats.requests - stats.connections
+
+        # an overloaded server is retried
+        assert fetch_recipe(f'{recipe_site}/flaky', cache=RecipeCache(None)).title == 'Pancakes'
+        assert RecipeSiteHandler.served[-2:] == [('/flaky', 503), ('/flaky', 200)]
+    finally:
+        configure_session()
+
+def test_retry_deadline(recipe_site):
+    # a Retry-After that would go past the deadline isn't waited out
+    start = time.monotonic()
+    with pytest.raises(RecipeFetchError, match='429'):
+        fetch_recipe(f'{recipe_site}/busy', timeout=1, cache=RecipeCache(None))
+    assert time.monotonic() - start < 1
+    assert RecipeSiteHandler.served == [('/busy', 429)]
+
+    # nor is a backoff
+    configure_session(backoff=5)
+    try:
+        with pytest.raises(RecipeFetchError, match='503'):
+            fetch_recipe(f'{recipe_site}/flaky', timeout=1, cache=RecipeCache(None))
+        assert time.monotonic() - start < 2
+    finally:
+        configure_session()
+
+def test_recipe_library(tmp_path, monkeypatch):
+    library = RecipeLibrary(str(tmp_path / 'library.sqlite3'))
+    lines = ['2 cups flour', '2 eggs', '1 cup milk', '3 tablespoons butter, melted', '1 pinch salt']
+    recipe = Recipe('Pancakes', lines, '4 servings', 'https://Example.com/pancakes/?utm_source=mail', None, 2)
+    recipe_id = save_recipe(recipe, library)
+    # saving it again replaces it
+    assert save_recipe(recipe, library) == recipe_id
+    assert len(library) == 1
+    assert library.find_by_url('https://example.com/pancakes').id == recipe_id
+    assert [saved.id for saved in library.find_by_title('pancakes')] == [recipe_id]
+    assert [saved.id for saved in library.search('CAKE')] == [recipe_id]
+    assert library.search('waffle') == []
+    # saved at its original yield
+    assert library.get(recipe_id).yields == '4 servings'
+    assert recipe.base_yields == '4 servings'
+
+    expected = ShoppingList(['1 cup flour'])
+    expected.add_recipe(recipe)
+
+    # adding a saved recipe doesn't parse anything
+    shopping_list = ShoppingList(['1 cup flour'])
+    def no_parsing(*args, **kwargs):
+        raise AssertionError("parsed a saved recipe")
+    monkeypatch.setattr(project, 'parse_ingredients', no_parsing)
+    monkeypatch.setattr(project, 'parse_ingredient_cached', no_parsing)
+    assert add_saved_recipe(shopping_list, recipe_id, 2, library) == 0
+    assert str(shopping_list) == str(expected)
+    assert [item.category for item in shopping_list.items] == [item.category for item in expected.items]
+    assert [item.unit for item in shopping_list.items] == [item.unit for item in expected.items]
+    assert shopping_list.recipes[0].yeilds == '4 servings (2x ingredients)'
+    with pytest.raises(ValueError):
+        add_saved_recipe(shopping_list, recipe_id + 1, library=library)
+    monkeypatch.undo()
+
+    # records made by another parser or vocabulary are rebuilt
+    library.update_records(recipe_id, [], 'old')
+    shopping_list = ShoppingList(['1 cup flour'])
+    add_saved_recipe(shopping_list, recipe_id, 2, library)
+    assert str(shopping_list) == str(expected)
+    assert len(library.get(recipe_id).records) == len(lines)
+
+    # a line that couldn't be parsed is saved too, and reported when the recipe is added
+    parse_ingredients = project.parse_ingredients
+    def salt_fails(lines):
+        return [ValueError() if line == '1 pinch salt' else parsed for line, parsed in zip(lines, parse_ingredients(lines))]
+    monkeypatch.setattr(project, 'parse_ingredients', salt_fails)
+    broken_id = save_recipe(Recipe('Salty pancakes', lines, '4 servings', None), library)
+    monkeypatch.undo()
+    records = library.get(broken_id).records
+    assert len(records) == len(lines)
+    assert records[-1] == {'sentence': '1 pinch salt', 'failed': "Couldn't parse that item - 1 pinch salt."}
+    shopping_list = ShoppingList()
+    assert add_saved_recipe(shopping_list, broken_id, library=library) == 1
+    assert shopping_list.length == len(lines) - 1
+
+def test_recipe_provenance():
+    pancakes = ['2 cups flour', '2 eggs', '1 cup milk', '1 pinch salt']
+    omelette = ['3 eggs', '1 tablespoon butter', '1 pinch salt']
+    def build(*recipes):
+        shopping_list = ShoppingList(['1 cup flour'])
+        for title, lines, coeff in recipes:
+            shopping_list.add_recipe(Recipe(title, lines, '4 servings', None, None, coeff))
+        return shopping_list
+
+    shopping_list = build(('Pancakes', pancakes, 1), ('Omelette', omelette, 1))
+    flour, eggs = shopping_list.items[0], shopping_list.items[1]
+    assert eggs.quantity == '5'
+
+    # rescaling only redoes the items the recipe added to, in place
+    shopping_list.rescale_recipe('Omelette', 2)
+    assert str(shopping_list) == str(build(('Pancakes', pancakes, 1), ('Omelette', omelette, 2)))
+    assert shopping_list.items[1] is eggs and eggs.quantity == '8'
+    assert shopping_list.recipes[1].yeilds == '4 servings (2x ingredients)'
+    shopping_list.rescale_recipe('Pancakes', 0.5)
+    assert str(shopping_list) == str(build(('Pancakes', pancakes, 0.5), ('Omelette', omelette, 2)))
+    assert shopping_list.string_categorized_items() == build(('Pancakes', pancakes, 0.5), ('Omelette', omelette, 2)).string_categorized_items()
+
+    # removing one takes its part back off, and drops items only it added. the
+    # rest keep their places, so only the order can differ from starting over
+    shopping_list.remove_recipe('Pancakes')
+    expected = build(('Omelette', omelette, 2))
+    assert sorted(map(str, shopping_list.items)) == sorted(map(str, expected.items))
+    assert {category: sorted(map(str, items)) for category, items in shopping_list.categorized_items().items()} == \
+        {category: sorted(map(str, items)) for category, items in expected.categorized_items().items()}
+    assert [recipe.title for recipe in shopping_list.recipes] == ['Omelette']
+    assert shopping_list.items[0] is flour
+
+    # items removed by hand are forgotten
+    shopping_list.remove_item(1)
+    shopping_list.remove_recipe('Omelette')
+    assert str(shopping_list) == 'flour, 1 cup'
+    assert shopping_list.add_item('1 cup flour') == 1
+
+    with pytest.raises(ValueError):
+        shopping_list.remove_recipe('Omelette')
+    shopping_list.add_recipe(Recipe('Pancakes', pancakes, None, None))
+    with pytest.raises(TypeError):
+        shopping_list.rescale_recipe('Pancakes', '2')
+    with pytest.raises(ValueError):
+        shopping_list.rescale_recipe('Pancakes', 0)
+    recipe = Recipe('Toast', ['1 slice bread'], None, None, None, 2)
+    assert recipe.yeilds is None
+
+    # a line that can't be scaled stays as it was, and doesn't hold up the rest
+    shopping_list = ShoppingList(['1 cup milk', '1 slice bread'])
+    shopping_list.add_recipe(Recipe('Garlic bread', ['2-3 cloves garlic', '1 cup milk', '2 slices bread'], '4 servings', None))
+    shopping_list.rescale_recipe('Garlic bread', 2)
+    assert str(shopping_list) == 'milk, 3 cups\nbread, 5 slices\ngarlic, 2-3 cloves'
+
+    # nothing is changed if any item can't be added up again
+    before = str(shopping_list)
+    def fails(contributions, calls=[]):
+        calls.append(None)
+        if len(calls) > 1:
+            raise ValueError("can't add these")
+        return ShoppingList._total(contributions)
+    shopping_list._total = fails
+    with pytest.raises(ValueError):
+        shopping_list.remove_recipe('Garlic bread')
+    assert str(shopping_list) == before
+    assert [recipe.title for recipe in shopping_list.recipes] == ['Garlic bread']
+    del shopping_list._total
+    shopping_list.remove_recipe('Garlic bread')
+    assert str(shopping_list) == 'milk, 1 cup\nbread, 1 slice'
+
+def test_change_recipe_no_change(monkeypatch):
+    import simple_term_menu
+    # pick the first recipe, change its yield, then pick 'No change'
+    choices = iter([0, 0, 0])
+    class Menu:
+        def __init__(self, entries):
+            pass
+        def show(self):
+            return next(choices)
+    monkeypatch.setattr(simple_term_menu, 'TerminalMenu', Menu)
+    shopping_list = ShoppingList()
+    shopping_list.add_recipe(Recipe('Omelette', ['3 eggs'], '2 servings', None, None, 2))
+    project.change_recipe(shopping_list)
+    assert shopping_list.recipes[0].coeff == 2
+    assert str(shopping_list) == 'eggs, 6'
+
+def test_lazy_loaders_build_once(monkeypatch):
+    import ingredient_categorizer
+    monkeypatch.setattr(ingredient_categorizer, '_term_matcher', None)
+    monkeypatch.setattr(ingredient_categorizer, '_fuzzy_index', None)
+    barrier = threading.Barrier(4)
+    built = []
+    def load():
+        barrier.wait()
+        built.append((ingredient_categorizer.get_term_matcher(), ingredient_categorizer.get_fuzzy_index()))
+    threads = [threading.Thread(target=load) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(matcher) for matcher, index in built}) == 1
+    assert len({id(index) for matcher, index in built}) == 1
@@ -1,10 +1,56 @@
-import inflect
-import pint
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import sys
+import threading
+import time
+from functools import lru_cache
+from collections import OrderedDict, namedtuple
+from fractions import Fraction
+from importlib import metadata
+from typing import TYPE_CHECKING
+
+# pint is imported lazily (see below), but annotations still name its types
+if TYPE_CHECKING:
+    import pint
 
 ############################################
 # BEGIN UTILS.PY
 ############################################
-p = inflect.engine()
+
+# inflect and pint each take a good while to import and set up, and nothing needs
+# them until the first ingredient is made, so they're loaded on first use rather
+# than on import. p, UREG, PINT_UNITS and UNIT_CONVERSIONS are still available as
+# module attributes, they're just built the first time they're asked for.
+_lazy_lock = threading.RLock()
+_inflect_engine = None
+_unit_registry = None
+_unit_tables = None
+
+
+def __getattr__(name):
+    if name == "p":
+        return get_inflect_engine()
+    if name == "UREG":
+        return get_ureg()
+    if name == "PINT_UNITS":
+        return get_unit_tables()[0]
+    if name == "UNIT_CONVERSIONS":
+        return get_unit_tables()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_inflect_engine():
+    """Return the inflect engine, importing inflect on first use."""
+    global _inflect_engine
+    if _inflect_engine is None:
+        with _lazy_lock:
+            if _inflect_engine is None:
+                import inflect
+                _inflect_engine = inflect.engine()
+    return _inflect_engine
 
 # this is taken from a newer version of the parser - eventually this will just be from that but wanted to get the pint func going
 # Plural and singular units
@@ -114,6 +160,11 @@ for plural, singular in UNITS.items():
     _capitalized_units[plural.capitalize()] = singular.capitalize()
 UNITS = UNITS | _capitalized_units
 
+# Singular to plural units. Where two plurals share a singular, the first one wins
+PLURAL_UNITS = {}
+for plural, singular in UNITS.items():
+    PLURAL_UNITS.setdefault(singular, plural)
+
 # Dict mapping certain units to their imperial version in pint
 IMPERIAL_UNITS = {
     "cup": "imperial_cup",
@@ -124,9 +175,55 @@ IMPERIAL_UNITS = {
     "gallon": "imperial_gallon",
 }
 
-UREG = pint.UnitRegistry()
+# where pint keeps its cache of parsed definition files, which makes building the
+# registry about ten times quicker after the first run
+PINT_CACHE_FOLDER = ":auto:"
 
-def convert_to_pint_unit(unit: str, imperial_units: bool = False) -> str | pint.Unit:
+
+def get_ureg():
+    """Return the pint UnitRegistry, importing pint and building the registry from
+    its cache on first use. The registry is also made pint's application registry,
+    so pint.Unit(...) uses it rather than loading a second one.
+    """
+    global _unit_registry
+    if _unit_registry is None:
+        with _lazy_lock:
+            if _unit_registry is None:
+                import pint
+                registry = pint.UnitRegistry(cache_folder=PINT_CACHE_FOLDER)
+                pint.set_application_registry(registry)
+                _unit_registry = registry
+    return _unit_registry
+
+
+def is_pint_unit(unit) -> bool:
+    """Return whether unit is a pint.Unit. There can't be one before pint has been
+    imported, so this doesn't import it.
+    """
+    pint = sys.modules.get("pint")
+    return pint is not None and isinstance(unit, pint.Unit)
+
+@lru_cache(maxsize=1024)
+def pint_unit(name: str) -> pint.Unit:
+    """Return the pint.Unit that str() of a unit gave, ie to rebuild a unit that
+    was saved as text.
+
+    Examples
+    --------
+    >>> pint_unit(str(pint_unit("cup")))
+    <Unit('cup')>
+    """
+    return get_ureg().Unit(name)
+
+# Replacements to ensure correct matches in pint Unit Registry
+PINT_REPLACEMENTS = {
+    "fl oz": "floz",
+    "fluid oz": "fluid_ounce",
+    "fl ounce": "fluid_ounce",
+    "fluid ounce": "fluid_ounce",
+}
+
+def _convert_to_pint_unit(unit: str, imperial_units: bool = False) -> str | pint.Unit:
     """Convert a unit to a pint.Unit object, if possible.
     If the unit is not found in the pint Unit Registry, just return the input unit.
 
@@ -145,16 +242,16 @@ def convert_to_pint_unit(unit: str, imperial_units: bool = False) -> str | pint.
 
     Examples
     --------
-    >>> convert_to_pint_unit("")
+    >>> _convert_to_pint_unit("")
     ''
 
-    >>> convert_to_pint_unit("oz")
+    >>> _convert_to_pint_unit("oz")
     <Unit('ounce')>
 
-    >>> convert_to_pint_unit("fl oz")
+    >>> _convert_to_pint_unit("fl oz")
     <Unit('fluid_ounce')>
 
-    >>> convert_to_pint_unit("cup", imperial_units=True)
+    >>> _convert_to_pint_unit("cup", imperial_units=True)
     <Unit('imperial_cup')>
     """
     if "-" in unit:
@@ -169,13 +266,7 @@ def convert_to_pint_unit(unit: str, imperial_units: bool = False) -> str | pint.
       return unit
 
     # Define some replacements to ensure correct matches in pint Unit Registry
-    replacements = {
-        "fl oz": "floz",
-        "fluid oz": "fluid_ounce",
-        "fl ounce": "fluid_ounce",
-        "fluid ounce": "fluid_ounce",
-    }
-    for original, replacement in replacements.items():
+    for original, replacement in PINT_REPLACEMENTS.items():
         unit = unit.replace(original, replacement)
 
     if imperial_units:
@@ -184,12 +275,270 @@ def convert_to_pint_unit(unit: str, imperial_units: bool = False) -> str | pint.
 
     # If unit not empty string and found in Unit Registry,
     # return pint.Unit object for unit
-    if unit != "" and unit in UREG:
+    if unit != "" and unit in get_ureg():
+        import pint
         return pint.Unit(unit)
 
     return unit
 
 
+def _unit_names() -> set:
+    """Return every unit name we know of, in UNITS, IMPERIAL_UNITS and
+    PINT_REPLACEMENTS, both the names we're given and the ones they're turned into.
+    """
+    return (
+        set(UNITS) | set(UNITS.values())
+        | set(IMPERIAL_UNITS) | set(IMPERIAL_UNITS.values())
+        | set(PINT_REPLACEMENTS) | set(PINT_REPLACEMENTS.values())
+    )
+
+
+def _build_pint_units() -> dict:
+    """Build the table of every unit we know of (see _unit_names), as both US
+    customary and imperial, to what _convert_to_pint_unit makes of it.
+    """
+    return {
+        (name, imperial_units): _convert_to_pint_unit(name, imperial_units)
+        for name in _unit_names() | {""}
+        for imperial_units in (False, True)
+    }
+
+# Every ingredient's unit goes through convert_to_pint_unit, and the replacements and
+# registry lookup cost far more than the handful of units recipes actually use. Known
+# units are looked up in a table (PINT_UNITS), and anything else is converted once
+# and memoized. The table and UNIT_CONVERSIONS are themselves kept on disk, as plain
+# unit names, so they don't have to be worked out through pint on every run. They're
+# keyed on the pint version, our unit dictionaries and UNIT_TABLES_FORMAT, and
+# rebuilt if any of them changes.
+UNIT_TABLES_PATH = os.environ.get(
+    "SHOPPING_LIST_UNIT_TABLES",
+    os.path.join(os.path.expanduser("~"), ".cache", "shopping-list", "unit_tables.pickle"),
+)
+# bump whenever the code that builds the tables changes what's in them
+UNIT_TABLES_FORMAT = 2
+
+
+def _unit_tables_key() -> str:
+    try:
+        version = metadata.version("Pint")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    source = repr((UNIT_TABLES_FORMAT, version, sorted(UNITS.items()), sorted(IMPERIAL_UNITS.items()), sorted(PINT_REPLACEMENTS.items())))
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def _build_unit_tables(key: str) -> dict:
+    """Build the unit tables as plain data that can be written to disk - units as
+    (True, pint unit name), anything pint doesn't know as (False, text).
+    """
+    units = {
+        name: (is_pint_unit(unit), str(unit))
+        for name, unit in _build_pint_units().items()
+    }
+    conversions = {
+        str(unit): tuple(conversion)
+        for unit, conversion in _build_unit_conversions().items()
+    }
+    return {"key": key, "units": units, "conversions": conversions}
+
+
+def _read_unit_tables(path: str, key: str) -> dict | None:
+    try:
+        with open(path, "rb") as file:
+            tables = pickle.load(file)
+    # a missing, unreadable or half written file just means building them again
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+        return None
+    if not isinstance(tables, dict) or tables.get("key") != key:
+        return None
+    return tables
+
+
+def _write_unit_tables(path: str, tables: dict) -> None:
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as file:
+            pickle.dump(tables, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+    except OSError:
+        pass
+
+
+def get_unit_tables() -> tuple[dict, dict]:
+    """Return the PINT_UNITS and UNIT_CONVERSIONS tables, loading them on first use
+    from UNIT_TABLES_PATH, or building and saving them if it's missing or out of date.
+
+    Returns
+    -------
+    tuple[dict, dict]
+        PINT_UNITS, from (unit, imperial_units) to what convert_to_pint_unit returns,
+        and UNIT_CONVERSIONS, from pint.Unit to UnitConversion
+    """
+    global _unit_tables
+    if _unit_tables is None:
+        with _lazy_lock:
+            if _unit_tables is None:
+                key = _unit_tables_key()
+                tables = _read_unit_tables(UNIT_TABLES_PATH, key)
+                if tables is None:
+                    tables = _build_unit_tables(key)
+                    _write_unit_tables(UNIT_TABLES_PATH, tables)
+                import pint
+                get_ureg()
+                units = {
+                    name: pint.Unit(text) if is_unit else text
+                    for name, (is_unit, text) in tables["units"].items()
+                }
+                conversions = {
+                    pint.Unit(text): UnitConversion(*conversion)
+                    for text, conversion in tables["conversions"].items()
+                }
+                _unit_tables = (units, conversions)
+    return _unit_tables
+
+
+_convert_unknown_unit = lru_cache(maxsize=4096)(_convert_to_pint_unit)
+
+
+def convert_to_pint_unit(unit: str, imperial_units: bool = False) -> str | pint.Unit:
+    """Convert a unit to a pint.Unit object, if possible, from the precomputed
+    PINT_UNITS table. If the unit is not found in the pint Unit Registry, just
+    return the input unit.
+
+    Parameters
+    ----------
+    unit : str
+        Unit to find in pint Unit Registry
+    imperial_units : bool, optional
+        If True, use imperial units instead of US customary units for the following:
+        fluid ounce, cup, pint, quart, gallon.
+        Default is False, which results in US customary units being used.
+
+    Returns
+    -------
+    str | pint.Unit
+
+    Examples
+    --------
+    >>> convert_to_pint_unit("")
+    ''
+
+    >>> convert_to_pint_unit("oz")
+    <Unit('ounce')>
+
+    >>> convert_to_pint_unit("fl oz")
+    <Unit('fluid_ounce')>
+
+    >>> convert_to_pint_unit("cup", imperial_units=True)
+    <Unit('imperial_cup')>
+    """
+    converted = get_unit_tables()[0].get((unit, imperial_units))
+    if converted is None:
+        converted = _convert_unknown_unit(unit, imperial_units)
+    return converted
+
+
+UnitConversion = namedtuple("UnitConversion", ["dimension", "factor"])
+
+def _build_unit_conversions() -> dict:
+    """Build the table of unit conversions for every unit we know of (see
+    _unit_names) that pint recognises, from the pint.Unit to its dimension and its
+    factor to the base unit of that dimension (ie cubic meters for volume).
+    """
+    conversions = {}
+    for name in _unit_names():
+        for imperial_units in (False, True):
+            unit = _convert_to_pint_unit(name, imperial_units)
+            if is_pint_unit(unit) and unit not in conversions:
+                base = (1 * unit).to_base_units()
+                conversions[unit] = UnitConversion(str(base.dimensionality), base.magnitude)
+    return conversions
+
+# Adding ingredient amounts through pint means building Quantities and going through
+# its dimensional analysis for every merge. With the dimension and base factor of
+# each unit worked out up front, compatible amounts can be added with plain float
+# math, and pint is only needed for units that aren't in this table. It's loaded
+# along with PINT_UNITS, see get_unit_tables.
+
+
+def unit_conversion(unit) -> UnitConversion | None:
+    """Return the dimension and base unit factor for a pint.Unit, or None if it isn't
+    in the precomputed table.
+
+    Parameters
+    ----------
+    unit : pint.Unit
+        Unit to look up
+
+    Returns
+    -------
+    UnitConversion | None
+
+    Examples
+    --------
+    >>> unit_conversion(convert_to_pint_unit("cup")).dimension
+    '[length] ** 3'
+
+    >>> round(unit_conversion(convert_to_pint_unit("quart")).factor / unit_conversion(convert_to_pint_unit("cup")).factor, 6)
+    4.0
+    """
+    return get_unit_tables()[1].get(unit)
+
+
+# Sums converted between units come back as floats, and are turned back into fractions
+# with at most this denominator, so fractions don't grow without bound over many merges.
+QUANTITY_DENOMINATOR_LIMIT = 10**6
+
+
+def to_fraction(value: str | int | float | Fraction) -> Fraction:
+    """Convert a quantity to an exact Fraction. Floats are taken at their shortest
+    decimal representation, so 1.1 becomes 11/10 rather than its binary approximation.
+
+    Parameters
+    ----------
+    value : str | int | float | Fraction
+        Quantity to convert, ie 2, 0.5, "1.5" or "3/4"
+
+    Returns
+    -------
+    Fraction
+
+    Raises
+    ------
+    ValueError
+        If value isn't a single number, ie a range like "2-3"
+
+    Examples
+    --------
+    >>> to_fraction("1.5")
+    Fraction(3, 2)
+
+    >>> to_fraction(1.1)
+    Fraction(11, 10)
+    """
+    if isinstance(value, float):
+        value = repr(value)
+    try:
+        return Fraction(value)
+    except (TypeError, ZeroDivisionError) as e:
+        raise ValueError(f"Not a quantity: {value!r}") from e
+
+
+def format_quantity(value: Fraction | float | int) -> str:
+    """Format a quantity for display, to 3 significant figures.
+
+    Examples
+    --------
+    >>> format_quantity(Fraction(5, 4))
+    '1.25'
+
+    >>> format_quantity(Fraction(1, 3))
+    '0.333'
+    """
+    return f"{float(value):.3g}"
+
+
 def singularize_unit(unit: str) -> str:
     """Return the singular form of a unit, if it exists in the UNITS dictionary.
     If the unit is not found in the dictionary, just return the input unit.
@@ -242,10 +591,7 @@ def pluralize_unit(unit: str) -> str:
     >>> pluralize_unit("g")
     'g'
     """
-    for k, v in UNITS.items():
-      if v == unit:
-        return k
-    return unit
+    return PLURAL_UNITS.get(unit, unit)
 
 def pluralize(noun: str, count: float | int = 0) -> str:
     """Return the plural form of a noun, from inflect engine, unless count is exactly 1. This logic may need tweaking.
@@ -269,9 +615,7 @@ def pluralize(noun: str, count: float | int = 0) -> str:
     """
     if count == 1:
         return noun
-    if p.singular_noun(noun) == False:
-        return p.plural(noun, count)
-    return noun
+    return _plural_noun(noun)
 
 
 def singularize(noun: str) -> str:
@@ -289,4 +633,218 @@ def singularize(noun: str) -> str:
     Examples
     --------
     """
-    return p.singular_noun(noun) or noun
+    return _singular_noun(noun)
+
+
+# The inflect engine is slow and gets asked about the same few nouns over and over,
+# every time a quantity changes, so its answers are memoized. Any count other than
+# exactly 1 pluralizes the same way, so the count isn't part of the key.
+@lru_cache(maxsize=4096)
+def _plural_noun(noun: str) -> str:
+    p = get_inflect_engine()
+    if p.singular_noun(noun) == False:
+        return p.plural(noun, 2)
+    return noun
+
+
+@lru_cache(maxsize=4096)
+def _singular_noun(noun: str) -> str:
+    return get_inflect_engine().singular_noun(noun) or noun
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize"])
+
+class LRUCache:
+    """A bounded least recently used cache, which counts its hits, misses and evictions
+    so it can be sized for real traffic.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Number of entries to keep before evicting the least recently used one.
+        Default is 1024.
+
+    Examples
+    --------
+    >>> cache = LRUCache(maxsize=1)
+    >>> cache.put("garlic", "produce")
+    >>> cache.get("garlic")
+    'produce'
+    >>> cache.put("flour", "baking")
+    >>> cache.get("garlic") is None
+    True
+    >>> cache.info()
+    CacheInfo(hits=1, misses=1, evictions=1, maxsize=1, currsize=1)
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        if maxsize < 1:
+            raise ValueError("Cache maxsize must be at least 1.")
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if it isn't cached."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value) -> None:
+        """Cache value under key, evicting the least recently used entry if full."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def info(self) -> CacheInfo:
+        """Return the hit, miss and eviction counts and the current size."""
+        return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._data))
+
+    def clear(self) -> None:
+        """Empty the cache and reset its counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+def edit_distance(a: str, b: str, limit: int | None = None) -> int:
+    """Return the number of single character insertions, deletions, substitutions
+    and swaps of neighbouring characters that turn a into b. If limit is given,
+    gives up as soon as the distance must be more than limit, and returns limit + 1.
+
+    Examples
+    --------
+    >>> edit_distance("jalepeno", "jalapeno")
+    1
+
+    >>> edit_distance("brussel sprouts", "brussels sprout")
+    2
+
+    >>> edit_distance("flour", "cauliflower", limit=2)
+    3
+    """
+    if limit is not None and abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if limit is not None and min(current) > limit:
+            return limit + 1
+    return current[-1]
+
+
+def trigrams(text: str) -> set:
+    """Return the set of three character substrings of text, padded with a space
+    at each end so the start and end of the text count for something.
+
+    Examples
+    --------
+    >>> sorted(trigrams("pea"))
+    [' pe', 'ea ', 'pea']
+    """
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """An inverted index from trigrams to the terms that contain them, for finding
+    the terms spelled most like a query, ie ones a typo away.
+
+    Candidates are scored by the Dice coefficient of their trigrams and the query's
+    (1 for the same trigrams, 0 for none in common). The cost of a search is bounded:
+    the query's rarest trigrams are looked at first, since they narrow things down the
+    most, and the search stops where it is once it runs out of its time budget.
+
+    Parameters
+    ----------
+    terms : iterable of str, optional
+        Terms to index to start with.
+
+    Examples
+    --------
+    >>> index = TrigramIndex(["jalapeno", "jackfruit", "japanese eggplant"])
+    >>> index.search("jalepeno")
+    [('jalapeno', 0.625)]
+    """
+
+    def __init__(self, terms=()):
+        self._terms = []
+        self._sizes = []
+        self._ids = {}
+        self._postings = {}
+        for term in terms:
+            self.add(term)
+
+    def __len__(self):
+        return len(self._terms)
+
+    def __contains__(self, term):
+        return term in self._ids
+
+    def add(self, term: str) -> None:
+        """Index term, if it isn't already."""
+        if term in self._ids:
+            return
+        term_id = self._ids[term] = len(self._terms)
+        grams = trigrams(term)
+        self._terms.append(term)
+        self._sizes.append(len(grams))
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(term_id)
+
+    def search(self, query: str, limit: int = 5, threshold: float = 0.5, budget: float | None = None) -> list:
+        """Return up to limit (term, score) pairs for the indexed terms that score at
+        least threshold against query, best first.
+
+        Parameters
+        ----------
+        query : str
+            Text to look for
+        limit : int, optional
+            Most candidates to return. Default is 5.
+        threshold : float, optional
+            Lowest score to return, from 0 to 1. Default is 0.5.
+        budget : float | None, optional
+            Seconds the search may take before it stops looking at more trigrams and
+            scores what it has found. Default is None, for no limit.
+
+        Returns
+        -------
+        list[tuple[str, float]]
+        """
+        grams = trigrams(query)
+        deadline = None if budget is None else time.perf_counter() + budget
+        shared = {}
+        for gram in sorted(grams, key=lambda gram: len(self._postings.get(gram, ()))):
+            for term_id in self._postings.get(gram, ()):
+                shared[term_id] = shared.get(term_id, 0) + 1
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+        scored = []
+        for term_id, count in shared.items():
+            score = 2 * count / (len(grams) + self._sizes[term_id])
+            if score >= threshold:
+                scored.append((self._terms[term_id], score))
+        scored.sort(key=lambda candidate: (-candidate[1], candidate[0]))
+        return scored[:limit]